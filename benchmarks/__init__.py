@@ -0,0 +1,7 @@
+"""
+Performance benchmarks.
+
+Run with pytest-benchmark from the repository root:
+
+    python -m pytest benchmarks
+"""
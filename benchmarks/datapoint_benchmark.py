@@ -0,0 +1,56 @@
+"""
+Benchmarks for creating DataPoints.
+
+Construction time is measured for the validating constructor, for parsing
+from a string and for the trusted construction path used with bulk data.
+Memory use per point is reported in the extra info of the results.
+"""
+
+import datetime
+import tracemalloc
+
+import pytest
+
+from energy_plotter.datapoint import DataPoint
+
+
+POINTS = 10000
+START = datetime.datetime(2021, 2, 4)
+TIMESTAMPS = [START + datetime.timedelta(minutes=i) for i in range(POINTS)]
+LINES = ["{}\t{}".format(timestamp.strftime("%Y-%m-%d-%H:%M"), i)
+         for i, timestamp in enumerate(TIMESTAMPS)]
+
+CONSTRUCTORS = {
+    "validated": lambda: [DataPoint(timestamp=timestamp, pulses=i)
+                          for i, timestamp in enumerate(TIMESTAMPS)],
+    "from_string": lambda: [DataPoint.from_string(line) for line in LINES],
+    "from_validated": lambda: [DataPoint.from_validated(timestamp, i)
+                               for i, timestamp in enumerate(TIMESTAMPS)],
+    }
+
+
+def bytes_per_point(construct):
+    """
+    Return the memory allocated per point when creating POINTS DataPoints,
+    excluding the timestamps and pulse counts themselves.
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        datapoints = CONSTRUCTORS[construct]()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert len(datapoints) == POINTS
+    return (after - before) / POINTS
+
+
+@pytest.mark.parametrize("construct", list(CONSTRUCTORS))
+def test_datapoint_construction(benchmark, construct):
+    """
+    Measure the time to create POINTS DataPoints.
+    """
+    benchmark.extra_info["points"] = POINTS
+    benchmark.extra_info["bytes_per_point"] = bytes_per_point(construct)
+    datapoints = benchmark(CONSTRUCTORS[construct])
+    assert len(datapoints) == POINTS
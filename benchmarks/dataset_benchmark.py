@@ -0,0 +1,60 @@
+"""
+Benchmarks for building DataSets.
+"""
+
+import datetime
+import random
+
+import pytest
+
+from energy_plotter.datapoint import DataPoint
+from energy_plotter.dataset import DataSet
+
+
+MONTH = 30 * 24 * 60
+
+
+@pytest.fixture(scope="module")
+def month_fx():
+    """
+    Return a month of minute DataPoints in random order.
+    """
+    start = datetime.datetime(2021, 1, 1)
+    datapoints = [DataPoint(timestamp=start + datetime.timedelta(minutes=i),
+                            pulses=i % 3000)
+                  for i in range(MONTH)]
+    random.Random(0).shuffle(datapoints)
+    return datapoints
+
+
+# pylint: disable=redefined-outer-name
+
+def test_dataset_build(benchmark, month_fx):
+    """
+    Measure building a DataSet from a month of unordered points at once.
+    """
+    dataset = benchmark(DataSet, month_fx)
+    assert len(dataset) == MONTH
+
+
+def test_dataset_add(benchmark, month_fx):
+    """
+    Measure adding a month of unordered points to a DataSet one by one.
+    """
+    def add_all():
+        dataset = DataSet()
+        for datapoint in month_fx:
+            dataset.add(datapoint)
+        return dataset
+
+    dataset = benchmark.pedantic(add_all, rounds=3)
+    assert len(dataset) == MONTH
+
+
+def test_dataset_kwhs(benchmark, month_fx):
+    """
+    Measure computing the kWh values of a month of points in a DataSet.
+    """
+    dataset = DataSet(month_fx)
+    kwhs = benchmark(lambda: dataset.kwhs)
+    assert len(kwhs) == MONTH
@@ -0,0 +1,46 @@
+"""
+Benchmarks for rendering plots of synthetic data.
+"""
+
+import datetime
+
+import pytest
+
+from benchmarks.synthetic import write_span
+from energy_plotter.plot import Plot
+
+
+START = datetime.date(2021, 1, 1)
+DAYS = 31
+
+
+@pytest.fixture(scope="module")
+def plot_fx(tmp_path_factory):
+    """
+    Return a Plot for a month of synthetic data.
+    """
+    datadir = tmp_path_factory.mktemp("data")
+    write_span(str(datadir), START, DAYS, missing_days=0)
+    return Plot(str(datadir))
+
+
+# pylint: disable=redefined-outer-name
+
+def test_day_graph(benchmark, plot_fx, tmp_path):
+    """
+    Measure rendering the graph of a day, reusing the figure.
+    """
+    outfile = str(tmp_path / "day.png")
+    plot_fx.day_graph(START, outfile)
+    benchmark(plot_fx.day_graph, START, outfile)
+
+
+@pytest.mark.parametrize("decimation", ["minmax", "lttb", None])
+def test_range_graph(benchmark, plot_fx, tmp_path, decimation):
+    """
+    Measure rendering the graph of a month.
+    """
+    end = START + datetime.timedelta(days=DAYS - 1)
+    benchmark.pedantic(plot_fx.range_graph,
+                       args=(START, end, str(tmp_path / "range.png")),
+                       kwargs={"decimation": decimation}, rounds=3)
@@ -0,0 +1,103 @@
+"""
+Benchmarks for reading data files.
+
+The data is generated with benchmarks.synthetic: a year of daily files with
+outages, missing days and duplicated lines. Parse throughput and memory use
+per point are reported in the extra info of the results.
+"""
+
+import datetime
+import tracemalloc
+
+import pytest
+
+from benchmarks.synthetic import write_span
+from energy_plotter.data_reader import PulseReader
+
+
+START = datetime.date(2021, 1, 1)
+DAYS = 365
+SPANS = {"day": 1, "week": 7, "month": 30, "year": DAYS}
+
+
+@pytest.fixture(scope="module")
+def datadir_fx(tmp_path_factory):
+    """
+    Return a directory with a year of synthetic data files.
+    """
+    datadir = tmp_path_factory.mktemp("data")
+    write_span(str(datadir), START, DAYS)
+    return datadir
+
+
+# pylint: disable=redefined-outer-name
+
+@pytest.fixture(scope="module")
+def day_fx(datadir_fx):
+    """
+    Return the first day with data and the number of lines in its file.
+    """
+    day, path = PulseReader(datadir_fx).data_files()[0]
+    with open(path) as data_file:
+        return day, sum(1 for _ in data_file)
+
+
+def test_parse_day(benchmark, datadir_fx, day_fx):
+    """
+    Measure reading and parsing a data file of a day.
+    """
+    day, lines = day_fx
+    reader = PulseReader(datadir_fx)
+    benchmark(reader.read_day, day)
+    benchmark.extra_info["lines"] = lines
+    if benchmark.stats:  # None when run with --benchmark-disable
+        benchmark.extra_info["lines_per_second"] = (
+            lines / benchmark.stats.stats.mean)
+
+
+def test_cached_day(benchmark, datadir_fx, day_fx, tmp_path):
+    """
+    Measure reading a day from the parsed data cache.
+    """
+    day, _ = day_fx
+    reader = PulseReader(datadir_fx, cache_dir=str(tmp_path))
+    reader.read_day(day)
+    benchmark(reader.read_day, day)
+
+
+@pytest.mark.parametrize("span", list(SPANS))
+@pytest.mark.parametrize("cached", [False, True], ids=["parse", "cached"])
+def test_range_load(benchmark, datadir_fx, tmp_path, span, cached):
+    """
+    Measure the latency of loading a range of days.
+    """
+    reader = PulseReader(datadir_fx,
+                         cache_dir=str(tmp_path) if cached else None)
+    end = START + datetime.timedelta(days=SPANS[span] - 1)
+    if cached:
+        reader.read_range(START, end, skip_missing=True)
+    data = benchmark.pedantic(reader.read_range, args=(START, end),
+                              kwargs={"skip_missing": True}, rounds=3)
+    benchmark.extra_info["points"] = len(data)
+
+
+def test_memory_per_point(benchmark, datadir_fx):
+    """
+    Measure the memory used per point by a month of data, both as a
+    ColumnarDataSet and converted to a DataSet of DataPoints.
+    """
+    reader = PulseReader(datadir_fx)
+    end = START + datetime.timedelta(days=SPANS["month"] - 1)
+    tracemalloc.start()
+    try:
+        columnar = reader.read_range(START, end, skip_missing=True)
+        columnar_bytes = tracemalloc.get_traced_memory()[0]
+        dataset = columnar.to_dataset()
+        dataset_bytes = tracemalloc.get_traced_memory()[0] - columnar_bytes
+    finally:
+        tracemalloc.stop()
+    benchmark.extra_info["columnar_bytes_per_point"] = (
+        columnar_bytes / len(columnar))
+    benchmark.extra_info["dataset_bytes_per_point"] = (
+        dataset_bytes / len(dataset))
+    benchmark.pedantic(columnar.to_dataset, rounds=3)
@@ -0,0 +1,56 @@
+"""
+Benchmarks for the import time of the package.
+
+The import times are measured with "python -X importtime" in a fresh
+interpreter, and the modules imported are checked so that plotting
+dependencies don't creep into the data-only import path.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules that must not be imported unless a plot is rendered
+PLOTTING_MODULES = ("matplotlib", "PIL")
+
+
+def import_times(module):
+    """
+    Import a module in a new interpreter and return the import times.
+
+    :module: name of the module to import
+    :returns: dict from the names of all the imported modules to their
+              cumulative import times in microseconds
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         "import {}".format(module)],
+        cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", ["energy_plotter", "energy_plotter.plot"])
+def test_import_time(benchmark, module):
+    """
+    Measure the import time of the package and check that the plotting
+    libraries are not imported.
+    """
+    times = benchmark.pedantic(import_times, args=(module,), rounds=5,
+                               iterations=1)
+    top_level = {name.split(".")[0] for name in times}
+    assert not top_level.intersection(PLOTTING_MODULES)
+    benchmark.extra_info["cumulative_us"] = times[module]
+    benchmark.extra_info["slowest_imports"] = sorted(
+        times.items(), key=lambda item: item[1], reverse=True)[:10]
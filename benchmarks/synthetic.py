@@ -0,0 +1,95 @@
+"""
+Synthetic data files for benchmarks.
+
+The generated data resembles real meter data: a base load with a daily
+rhythm, random appliance spikes, minutes and whole days missing because of
+outages, and occasional duplicated lines from a logger restarting.
+"""
+
+import datetime
+import os
+
+import numpy as np
+
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def minute_profile(days, rng):
+    """
+    Return realistic pulse counts for a number of full days.
+
+    :days: number of days
+    :rng: numpy random Generator
+    :returns: uint32 array of days * 1440 pulse counts
+    """
+    minute_of_day = np.tile(np.arange(MINUTES_PER_DAY), days)
+    # Base load of about 0.3 kW peaking in the evening, plus noise
+    daily = 1.0 - np.cos(2 * np.pi * (minute_of_day - 19 * 60)
+                         / MINUTES_PER_DAY)
+    load = 50 + 40 * daily + rng.normal(0, 5, minute_of_day.size)
+    # Appliances running for a few minutes at 2-6 kW
+    spikes = rng.random(minute_of_day.size) < 0.01
+    load[spikes] += rng.uniform(300, 1000, spikes.sum())
+    return np.maximum(load, 0).astype(np.uint32)
+
+
+def write_span(directory, start, days,  # pylint: disable=too-many-arguments
+               missing_days=0.02, gap_rate=0.001, duplicate_rate=0.0005,
+               seed=0):
+    """
+    Write daily data files for a span of days.
+
+    :directory: directory for the data files
+    :start: datetime.date of the first day
+    :days: number of days in the span
+    :missing_days: probability of a day having no data file at all
+    :gap_rate: probability of an outage starting at each minute, each outage
+               lasting from a minute to a few hours
+    :duplicate_rate: probability of each line being written twice
+    :seed: seed for the random number generator
+    :returns: sorted list of the paths of the written files
+    """
+    rng = np.random.default_rng(seed)
+    pulses = minute_profile(days, rng)
+    lines = _format_lines(start, pulses)
+    repeats = _line_repeats(pulses.size, gap_rate, duplicate_rate, rng)
+
+    paths = []
+    for day in range(days):
+        if rng.random() < missing_days:
+            continue
+        day_slice = slice(day * MINUTES_PER_DAY, (day + 1) * MINUTES_PER_DAY)
+        path = os.path.join(directory, (start + datetime.timedelta(
+            days=day)).strftime("%Y-%m-%d.txt"))
+        _write_lines(path, np.repeat(lines[day_slice], repeats[day_slice]))
+        paths.append(path)
+    return paths
+
+
+def _format_lines(start, pulses):
+    """
+    Return the data file lines for consecutive minutes from a day on.
+    """
+    minutes = (np.datetime64(start, "m")
+               + np.arange(pulses.size).astype("timedelta64[m]"))
+    timestamps = np.char.replace(
+        np.datetime_as_string(minutes, unit="m"), "T", "-")
+    return np.char.add(np.char.add(timestamps, "\t"), pulses.astype(str))
+
+
+def _line_repeats(size, gap_rate, duplicate_rate, rng):
+    """
+    Return the number of times each line is written: 0 for minutes in
+    outages, 2 for duplicated lines and 1 otherwise.
+    """
+    repeats = np.where(rng.random(size) < duplicate_rate, 2, 1)
+    for gap_start in np.flatnonzero(rng.random(size) < gap_rate):
+        repeats[gap_start:gap_start + int(rng.integers(1, 240))] = 0
+    return repeats
+
+
+def _write_lines(path, lines):
+    with open(path, "w") as data_file:
+        if lines.size:
+            data_file.write("\n".join(lines.tolist()) + "\n")
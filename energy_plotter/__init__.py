@@ -0,0 +1,28 @@
+"""
+Plotting tools for energy meter pulse count data.
+
+The names exported here cover reading and working with the data as well as
+plotting. Importing the package doesn't import matplotlib: it is imported
+only when a plot is rendered.
+"""
+
+from energy_plotter.data_reader import DataNotFound, PulseReader
+from energy_plotter.datapoint import DataPoint
+from energy_plotter.dataset import ColumnarDataSet, DataSet
+from energy_plotter.meters import Meter, MultiMeterDataSet, MultiMeterReader
+from energy_plotter.parser import ParseError, parse_pulse_data
+from energy_plotter.plot import Plot
+
+__all__ = [
+    "ColumnarDataSet",
+    "DataNotFound",
+    "DataPoint",
+    "DataSet",
+    "Meter",
+    "MultiMeterDataSet",
+    "MultiMeterReader",
+    "ParseError",
+    "Plot",
+    "PulseReader",
+    "parse_pulse_data",
+    ]
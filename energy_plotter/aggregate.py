@@ -0,0 +1,102 @@
+"""
+Aggregation of pulse count data into time buckets.
+
+The functions here operate on a sorted array of timestamps given as integer
+minutes since 1970-01-01 00:00 and an array of values of the same length.
+Because the timestamps are sorted, each bucket is a contiguous run of the
+arrays, so grouping needs no sorting or per-point Python code: the run
+boundaries are found with a single diff and each statistic is computed with
+one ufunc reduceat call.
+
+Timestamps are local wall-clock times, so buckets are aligned to local
+midnight.
+"""
+
+import collections
+
+import numpy as np
+
+
+BUCKET_MINUTES = {
+    "15min": 15,
+    "hour": 60,
+    "day": 24 * 60,
+    }
+CALENDAR_BUCKETS = ("week", "month")
+
+Aggregate = collections.namedtuple("Aggregate", ["starts", "values"])
+Aggregate.__doc__ = """
+Values aggregated into time buckets.
+
+:starts: datetime64[m] array of the start times of non-empty buckets
+:values: array of the aggregated values of the buckets
+"""
+
+_REDUCERS = {
+    "sum": np.add,
+    "max": np.maximum,
+    "min": np.minimum,
+    }
+
+
+def bucket_starts(minutes, bucket):
+    """
+    Return the start minute of the bucket of each timestamp.
+
+    :minutes: array of timestamps as minutes since 1970-01-01 00:00
+    :bucket: name of a bucket size ("15min", "hour", "day", "week" or
+             "month") or a bucket length in minutes that divides a day evenly
+    :returns: int64 array of bucket start minutes
+    """
+    minutes = np.asarray(minutes, dtype=np.int64)
+    if bucket == "month":
+        return (minutes.view("datetime64[m]").astype("datetime64[M]")
+                .astype("datetime64[m]").astype(np.int64))
+    if bucket == "week":
+        # 1970-01-01 was a Thursday, weeks start on Mondays
+        offset = 3 * BUCKET_MINUTES["day"]
+        week = 7 * BUCKET_MINUTES["day"]
+        return (minutes + offset) // week * week - offset
+    length = BUCKET_MINUTES.get(bucket, bucket)
+    if (not isinstance(length, (int, np.integer)) or length <= 0
+            or BUCKET_MINUTES["day"] % length):
+        raise ValueError("Unknown bucket {!r}: use one of {} or a number of "
+                         "minutes that divides a day evenly".format(
+                             bucket, ", ".join(list(BUCKET_MINUTES)
+                                               + list(CALENDAR_BUCKETS))))
+    return minutes // length * length
+
+
+def aggregate(minutes, values, bucket, how="sum"):
+    """
+    Aggregate values into time buckets.
+
+    :minutes: sorted array of timestamps as minutes since 1970-01-01 00:00
+    :values: array of values corresponding to the timestamps
+    :bucket: bucket size, see bucket_starts
+    :how: statistic computed for each bucket: "sum", "mean", "max", "min"
+          or "count"
+    :returns: Aggregate of the non-empty buckets
+    """
+    if how not in ("sum", "mean", "max", "min", "count"):
+        raise ValueError("Unknown aggregation {!r}".format(how))
+    values = np.asarray(values)
+    if values.dtype.kind in "ub":
+        values = values.astype(np.int64)
+    starts = bucket_starts(minutes, bucket)
+    if starts.size == 0:
+        return Aggregate(starts.view("datetime64[m]"),
+                         np.zeros(0, dtype=float if how == "mean"
+                                  else np.int64 if how == "count"
+                                  else values.dtype))
+
+    first_indices = np.flatnonzero(np.diff(starts)) + 1
+    first_indices = np.concatenate(([0], first_indices))
+    counts = np.diff(np.append(first_indices, len(starts)))
+    if how == "count":
+        result = counts
+    elif how == "mean":
+        result = np.add.reduceat(values, first_indices) / counts
+    else:
+        result = _REDUCERS[how].reduceat(values, first_indices)
+    return Aggregate(starts[first_indices].view("datetime64[m]"), result)
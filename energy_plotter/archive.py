@@ -0,0 +1,220 @@
+"""
+Consolidated archive of pulse count data.
+
+Daily data files are convenient for logging, but reading a long time range
+from them means opening hundreds of files. The archive stores the whole
+history in a single file with one fixed-size record per minute, so that the
+location of any timestamp can be computed without searching and any time
+range can be read as a slice of a memory-mapped array.
+
+The file starts with a header containing a magic string and the minute
+(since 1970-01-01 00:00) of the first record. It is followed by one
+little-endian uint32 pulse count per minute, minutes without data being
+marked with the value 0xFFFFFFFF.
+
+An archive can be created or updated from the command line:
+
+    python -m energy_plotter.archive DATADIR ARCHIVE [--start YYYY-mm-dd]
+                                                     [--end YYYY-mm-dd]
+"""
+
+import argparse
+import datetime
+import os
+import struct
+
+import numpy as np
+
+from energy_plotter.data_reader import DataNotFound, PulseReader
+from energy_plotter.dataset import ColumnarDataSet
+
+
+MAGIC = b"EPARCHV1"
+MISSING = np.iinfo(np.uint32).max
+
+_HEADER = struct.Struct("<8sq16x")
+_RECORD = np.dtype("<u4")
+_MINUTES_PER_DAY = 24 * 60
+
+
+def compact(reader, path, start=None, end=None):
+    """
+    Write the data read by a PulseReader into an archive.
+
+    The archive is created if it doesn't exist, starting from the first day
+    written into it. Later days are appended to the end of the file, and days
+    that are already in the archive are overwritten in place, so an archive
+    can be updated again e.g. after the data file of the current day has
+    grown.
+
+    :reader: PulseReader for the daily data files
+    :path: location of the archive file
+    :start: datetime representation of the first day to write, by default
+            the first day with data
+    :end: datetime representation of the last day to write, by default the
+          last day with data
+    :returns: number of days written
+    """
+    days = reader.available_days(start, end)
+    if not days:
+        return 0
+    if not os.path.exists(path):
+        with open(path, "wb") as archive_file:
+            archive_file.write(_HEADER.pack(MAGIC, _day_minute(days[0])))
+
+    with open(path, "r+b") as archive_file:
+        base = _read_header(archive_file)
+        for day in days:
+            data = reader.read_day(day)
+            first = _day_minute(day)
+            last = first + _MINUTES_PER_DAY
+            if data:
+                first = min(first, int(data.minutes[0]))
+                last = max(last, int(data.minutes[-1]) + 1)
+            if first < base:
+                raise ValueError("Data for {} precedes the start of the "
+                                 "archive".format(day.strftime("%Y-%m-%d")))
+            if (data.pulses == MISSING).any():
+                raise ValueError("Pulse count {} cannot be archived"
+                                 "".format(MISSING))
+            records = np.full(last - first, MISSING, dtype=_RECORD)
+            records[data.minutes - first] = data.pulses
+            _write_records(archive_file, first - base, records)
+    return len(days)
+
+
+def _write_records(archive_file, offset, records):
+    """
+    Write records at the given record offset, filling any gap between the
+    current end of the file and the offset with missing values.
+    """
+    end = ((archive_file.seek(0, os.SEEK_END) - _HEADER.size)
+           // _RECORD.itemsize)
+    if end < offset:
+        archive_file.write(
+            np.full(offset - end, MISSING, dtype=_RECORD).tobytes())
+    archive_file.seek(_HEADER.size + offset * _RECORD.itemsize)
+    archive_file.write(records.tobytes())
+
+
+class ArchiveReader():
+    """
+    Read pulse count data from an archive.
+
+    The archive is memory-mapped, and ranges without gaps are returned
+    without copying the pulse counts.
+    """
+
+    def __init__(self, path):
+        """
+        Open an archive.
+
+        :path: location of the archive file
+        """
+        self.path = path
+        with open(path, "rb") as archive_file:
+            self._base = _read_header(archive_file)
+        self._records = None
+
+    def read_day(self, data_day):
+        """
+        Return the data of a single day.
+
+        Raises a DataNotFound error if the archive contains no data for the
+        day.
+
+        :data_day: datetime representation of the target day
+        :returns: ColumnarDataSet containing the data
+        """
+        data = self.read_range(data_day, data_day)
+        if not data:
+            raise DataNotFound("Data not found for date {}".format(
+                data_day.strftime("%Y-%m-%d")))
+        return data
+
+    def read_range(self, start, end):
+        """
+        Return the data of all days from start to end, inclusive.
+
+        Days without data are left out of the returned data.
+
+        :start: datetime representation of the first day
+        :end: datetime representation of the last day
+        :returns: ColumnarDataSet containing the data
+        """
+        first = max(_day_minute(start), self._base)
+        last = _day_minute(end) + _MINUTES_PER_DAY
+        records = self._map()[max(first - self._base, 0):
+                              max(last - self._base, 0)]
+        minutes = np.arange(first, first + len(records), dtype=np.int64)
+        present = records != MISSING
+        if not present.all():
+            minutes = minutes[present]
+            records = records[present]
+        return ColumnarDataSet.from_sorted(minutes, records)
+
+    @property
+    def first_day(self):
+        """
+        Return the first day covered by the archive.
+        """
+        return (datetime.date(1970, 1, 1)
+                + datetime.timedelta(days=self._base // _MINUTES_PER_DAY))
+
+    def _map(self):
+        """
+        Return the records as a memory-mapped array, remapping the file if it
+        has grown since it was last mapped.
+        """
+        size = ((os.path.getsize(self.path) - _HEADER.size)
+                // _RECORD.itemsize)
+        if self._records is None or len(self._records) != size:
+            if size == 0:
+                self._records = np.zeros(0, dtype=_RECORD)
+            else:
+                self._records = np.memmap(self.path, dtype=_RECORD, mode="r",
+                                          offset=_HEADER.size, shape=(size,))
+        return self._records
+
+
+def _read_header(archive_file):
+    """
+    Return the first minute of the archive from its header.
+    """
+    archive_file.seek(0)
+    header = archive_file.read(_HEADER.size)
+    if len(header) != _HEADER.size or header[:len(MAGIC)] != MAGIC:
+        raise ValueError("{} is not a pulse data archive"
+                         "".format(archive_file.name))
+    return _HEADER.unpack(header)[1]
+
+
+def _day_minute(day):
+    """
+    Return the minute since epoch of the start of the given day.
+    """
+    if isinstance(day, datetime.datetime):
+        day = day.date()
+    return (day - datetime.date(1970, 1, 1)).days * _MINUTES_PER_DAY
+
+
+def main(args=None):
+    """
+    Compact the daily data files of a directory into an archive.
+    """
+    def date(value):
+        return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("datadir", help="location of the data files")
+    parser.add_argument("archive", help="archive file to create or update")
+    parser.add_argument("--start", type=date, help="first day to write")
+    parser.add_argument("--end", type=date, help="last day to write")
+    args = parser.parse_args(args)
+    days = compact(PulseReader(args.datadir), args.archive, args.start,
+                   args.end)
+    print("{} days written to {}".format(days, args.archive))
+
+
+if __name__ == "__main__":
+    main()
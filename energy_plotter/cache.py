@@ -0,0 +1,146 @@
+"""
+Caches for parsed pulse count data.
+"""
+
+import collections
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+from energy_plotter import instrumentation
+from energy_plotter.dataset import ColumnarDataSet
+
+
+class DayCache():
+    """
+    Persistent binary cache of parsed data files.
+
+    Each parsed file is stored as a .npy file containing a 2 x N uint32 array,
+    the first row holding the minutes since 1970-01-01 00:00 and the second
+    the pulse counts. Cached files are read memory-mapped.
+
+    Cache entries are keyed by the absolute path, size and modification time
+    of the source file, so a file that has changed since it was cached (e.g.
+    the still growing data file of the current day) is parsed again.
+    """
+
+    def __init__(self, cache_dir):
+        """
+        Create a cache storing its files in the given directory.
+
+        :cache_dir: directory for the cache files, created if needed
+        """
+        self.cache_dir = cache_dir
+
+    def read(self, path, parse):
+        """
+        Return the data of a file from the cache, parsing it if needed.
+
+        :path: path to the data file
+        :parse: function returning a ColumnarDataSet for a path, used when
+                the file isn't cached
+        """
+        stat = os.stat(path)
+        entry = self._entry(path, stat)
+        try:
+            columns = np.load(entry, mmap_mode="r")
+        except (OSError, ValueError):
+            instrumentation.count("cache.misses")
+            data = parse(path)
+            self._store(entry, data)
+            return data
+        instrumentation.count("cache.hits")
+        return ColumnarDataSet.from_sorted(columns[0].astype(np.int64),
+                                           columns[1])
+
+    def _entry(self, path, stat):
+        """
+        Return the path of the cache file for a data file.
+        """
+        digest = hashlib.sha1(
+            os.path.abspath(path).encode()).hexdigest()
+        return os.path.join(self.cache_dir, digest,
+                            "{}-{}.npy".format(stat.st_size, stat.st_mtime_ns))
+
+    def _store(self, entry, data):
+        """
+        Write data to a cache file and remove older versions of it.
+
+        Data that cannot be represented in the cache format is not stored.
+        """
+        minutes = data.minutes
+        if len(minutes) and (minutes[0] < 0 or minutes[-1] > _MAX_MINUTE):
+            return
+        directory = os.path.dirname(entry)
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if name.endswith(".npy"):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except FileNotFoundError:
+                    pass
+
+        columns = np.vstack([minutes, data.pulses]).astype(np.uint32)
+        with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp",
+                                         delete=False) as tmp_file:
+            np.save(tmp_file, columns)
+        os.replace(tmp_file.name, entry)
+
+
+class LRUCache():
+    """
+    In-memory cache keeping the most recently used entries.
+
+    The number of lookups that found an entry and that didn't are counted
+    in hits and misses.
+    """
+
+    def __init__(self, max_entries):
+        """
+        Create a cache.
+
+        :max_entries: maximum number of entries kept
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+
+    def get(self, key, default=None):
+        """
+        Return the value stored for a key, or default if there is none.
+        """
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Store a value, evicting the least recently used entries if needed.
+        """
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+
+_MAX_MINUTE = np.iinfo(np.uint32).max
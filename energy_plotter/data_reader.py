@@ -2,12 +2,20 @@
 Tools for reading input data.
 """
 
-import glob
+import concurrent.futures
+import datetime
+import functools
 import os
 
+import numpy as np
 
-from energy_plotter.datapoint import DataPoint
-from energy_plotter.dataset import DataSet
+
+from conf import KWH_PER_PULSE
+from energy_plotter import instrumentation
+from energy_plotter.cache import DayCache
+from energy_plotter.dataset import ColumnarDataSet
+from energy_plotter.directory_index import DirectoryIndex
+from energy_plotter.parser import parse_pulse_data
 
 
 class PulseReader():
@@ -20,25 +28,144 @@ class PulseReader():
     "2021-01-29-23:43") and the number of pulses separated with whitespace.
     """
 
-    def __init__(self, datadir):
+    def __init__(self, datadir, cache_dir=None, kwh_per_pulse=KWH_PER_PULSE):
         """
         Initialize the reader.
 
         :datadir: location of the data files
+        :cache_dir: if given, parsed data files are cached in binary format in
+                    this directory (e.g. a subdirectory of datadir) and read
+                    from there while the data file is unchanged
+        :kwh_per_pulse: energy corresponding to a single pulse of the meter
+                        whose data is read
         """
         self.datadir = datadir
+        self.kwh_per_pulse = kwh_per_pulse
+        self._index = DirectoryIndex(datadir)
+        self._cache = DayCache(cache_dir) if cache_dir is not None else None
 
     def read_day(self, data_day):
         """
         Return the data of a single day.
 
+        Raises a ParseError listing all the invalid lines if the data file
+        contains any.
+
         :data_day: datetime representation of the target day
+        :returns: ColumnarDataSet containing the data
+        """
+        return self._with_constant(
+            _read_file(self._data_file(data_day), self._cache))
+
+    def read_range(self, start, end, workers=None, processes=False,
+                   skip_missing=False):
+        """
+        Return the data of all days from start to end, inclusive.
+
+        The data files are located with a single scan of the data directory
+        and parsed concurrently. If data is missing for any of the days, a
+        DataNotFound error listing all of them is raised before any files are
+        read, unless skip_missing is set. The missing days can be checked
+        beforehand using missing_days.
+
+        :start: datetime representation of the first day
+        :end: datetime representation of the last day
+        :workers: maximum number of files parsed simultaneously, defaults to
+                  the executor default
+        :processes: parse the files in a process pool instead of threads
+        :skip_missing: ignore missing days instead of raising DataNotFound
+        :returns: ColumnarDataSet containing the data
+        """
+        paths = self._data_files(start, end)
+        missing = [day for day, path in paths if path is None]
+        if missing and not skip_missing:
+            raise DataNotFound("Data not found for dates {}".format(
+                ", ".join(day.strftime("%Y-%m-%d") for day in missing)))
+        paths = [path for _, path in paths if path is not None]
+
+        read_file = functools.partial(_read_file, cache=self._cache)
+        if workers == 1 or len(paths) <= 1:
+            return self._with_constant(
+                ColumnarDataSet.concatenate(map(read_file, paths)))
+        executor_class = (concurrent.futures.ProcessPoolExecutor if processes
+                          else concurrent.futures.ThreadPoolExecutor)
+        with executor_class(max_workers=workers) as executor:
+            return self._with_constant(
+                ColumnarDataSet.concatenate(executor.map(read_file, paths)))
+
+    def follow(self, data_day=None):
+        """
+        Return a DayFollower for incrementally reading a growing data file.
+
+        :data_day: datetime representation of the day to follow, by default
+                   the current day, switching to the next day at midnight
+        """
+        return DayFollower(self._data_file, data_day, self.kwh_per_pulse)
+
+    def missing_days(self, start, end):
+        """
+        Return a list of days from start to end (inclusive) without data.
+
+        :start: datetime representation of the first day
+        :end: datetime representation of the last day
+        """
+        return [day for day, path in self._data_files(start, end)
+                if path is None]
+
+    def available_days(self, start=None, end=None):
+        """
+        Return a sorted list of days for which data files exist.
+
+        :start: datetime representation of the first day to include, by
+                default the earliest day with data
+        :end: datetime representation of the last day to include, by default
+              the latest day with data
+        """
+        return [day for day in self._index.days()
+                if (start is None or day >= _as_date(start))
+                and (end is None or day <= _as_date(end))]
+
+    def data_files(self, start=None, end=None):
         """
-        data = DataSet()
-        with open(self._data_file(data_day), "r") as data_file:
-            for line in data_file:
-                data.add(DataPoint.from_string(line))
-        return data
+        Return the data files of the days for which data files exist.
+
+        Raises a ValueError if more than one data file exists for any of the
+        days.
+
+        :start: datetime representation of the first day to include, by
+                default the earliest day with data
+        :end: datetime representation of the last day to include, by default
+              the latest day with data
+        :returns: list of (day, path) tuples
+        """
+        return [(day, self._data_file(day))
+                for day in self.available_days(start, end)]
+
+    def _with_constant(self, data):
+        """
+        Return data read from files with the constant of this reader.
+        """
+        if data.kwh_per_pulse == self.kwh_per_pulse:
+            return data
+        return data.with_kwh_per_pulse(self.kwh_per_pulse)
+
+    def _data_files(self, start, end):
+        """
+        Return the data files for a range of days.
+
+        Raises a ValueError if more than one data file exists for any of the
+        days.
+
+        :returns: list of (day, path) tuples, path being None for days
+                  without a data file
+        """
+        day = _as_date(start)
+        files = []
+        while day <= _as_date(end):
+            matching_files = self._matching_files(day)
+            files.append((day, matching_files[0] if matching_files else None))
+            day += datetime.timedelta(days=1)
+        return files
 
     def _data_file(self, data_day):
         """
@@ -50,16 +177,195 @@ class PulseReader():
         :data_day: Datetime representation of the target day
         :returns: path to a data file if one is found
         """
-        # pylint: disable=no-self-use
-        timestamp = data_day.strftime("%Y-%m-%d")
-        matching_files = glob.glob(os.path.join(self.datadir,
-                                                "{}.*".format(timestamp)))
+        matching_files = self._matching_files(data_day)
         if not matching_files:
-            raise DataNotFound("Data not found for date {}".format(timestamp))
+            raise DataNotFound("Data not found for date {}".format(
+                data_day.strftime("%Y-%m-%d")))
+        return matching_files[0]
+
+    def _matching_files(self, data_day):
+        """
+        Return a list with the data file of a day, or an empty list.
+
+        Raises a ValueError if more than one data files exist for the given
+        date.
+        """
+        matching_files = self._index.files(data_day)
         if len(matching_files) > 1:
             raise ValueError("More than one data file found for date {}: {}"
-                             "".format(timestamp, ", ".join(matching_files)))
-        return matching_files[0]
+                             "".format(data_day.strftime("%Y-%m-%d"),
+                                       ", ".join(matching_files)))
+        return matching_files
+
+
+class DayFollower():  # pylint: disable=too-many-instance-attributes
+    """
+    Incremental reader for a data file that is being appended to.
+
+    The follower remembers how far the file has been read and the data parsed
+    so far, so each refresh only parses the lines appended since the previous
+    one. A trailing line without a newline is considered to be still being
+    written and is parsed only once it is complete.
+    """
+
+    def __init__(self, locate_file, data_day=None,
+                 kwh_per_pulse=KWH_PER_PULSE):
+        """
+        Create a follower for the data file of a day.
+
+        :locate_file: function returning the path to the data file of a
+                      given day, raising DataNotFound if there is none
+        :data_day: datetime representation of the day to follow, or None to
+                   follow the current day
+        :kwh_per_pulse: energy corresponding to a single pulse
+        """
+        self._locate_file = locate_file
+        self._kwh_per_pulse = kwh_per_pulse
+        self._fixed_day = _as_date(data_day) if data_day else None
+        self._day = None
+        self._identity = None
+        self._offset = 0
+        self._lines = 0
+        self._partial_line = b""
+        self._minutes = np.empty(0, dtype=np.int64)
+        self._pulses = np.empty(0, dtype=np.uint32)
+        self._length = 0
+
+    @property
+    def day(self):
+        """
+        The day whose data is being followed.
+        """
+        return self._fixed_day or self._day
+
+    @property
+    def data(self):
+        """
+        The data read so far, as a ColumnarDataSet.
+        """
+        return ColumnarDataSet.from_sorted(self._minutes[:self._length],
+                                           self._pulses[:self._length],
+                                           self._kwh_per_pulse)
+
+    def refresh(self):
+        """
+        Read the lines appended to the data file since the last refresh.
+
+        When following the current day, the day changing resets the follower
+        to the data file of the new day. The file being truncated or replaced
+        causes it to be read again from the beginning.
+
+        :returns: ColumnarDataSet containing all the data of the day so far
+        """
+        day = self._fixed_day or datetime.date.today()
+        if day != self._day:
+            self._reset(day)
+        try:
+            path = self._locate_file(day)
+        except DataNotFound:
+            self._reset(day)
+            return self.data
+        with instrumentation.timer("read"), open(path, "rb") as data_file:
+            stat = os.fstat(data_file.fileno())
+            identity = (path, stat.st_dev, stat.st_ino)
+            if identity != self._identity or stat.st_size < self._offset:
+                self._reset(day)
+                self._identity = identity
+            data_file.seek(self._offset)
+            appended = data_file.read()
+        self._offset += len(appended)
+        _count_read(appended)
+
+        content = self._partial_line + appended
+        complete_length = content.rfind(b"\n") + 1
+        self._partial_line = content[complete_length:]
+        new_data = parse_pulse_data(content[:complete_length], source=path,
+                                    first_line=self._lines + 1)
+        self._lines += content.count(b"\n", 0, complete_length)
+        self._append(new_data)
+        return self.data
+
+    def _append(self, new_data):
+        """
+        Add newly parsed data after the data read earlier.
+        """
+        if not new_data:
+            return
+        if self._length and new_data.minutes[0] <= self._minutes[
+                self._length - 1]:
+            # Out of order lines: merge everything into new buffers, leaving
+            # the arrays of previously returned datasets untouched.
+            new_data = ColumnarDataSet.concatenate([
+                self.data, new_data.with_kwh_per_pulse(self._kwh_per_pulse)])
+            self._length = 0
+            self._allocate(len(new_data))
+        end = self._length + len(new_data)
+        if end > len(self._minutes):
+            self._allocate(max(end, 2 * len(self._minutes)))
+        self._minutes[self._length:end] = new_data.minutes
+        self._pulses[self._length:end] = new_data.pulses
+        self._length = end
+
+    def _reset(self, day):
+        """
+        Forget all data read so far and start following the given day.
+        """
+        self._day = day
+        self._identity = None
+        self._offset = 0
+        self._lines = 0
+        self._partial_line = b""
+        self._length = 0
+        self._allocate(24 * 60)
+
+    def _allocate(self, capacity):
+        """
+        Move the data read so far into new buffers of the given capacity.
+        """
+        minutes = np.empty(capacity, dtype=np.int64)
+        pulses = np.empty(capacity, dtype=np.uint32)
+        if self._length:
+            minutes[:self._length] = self._minutes[:self._length]
+            pulses[:self._length] = self._pulses[:self._length]
+        self._minutes = minutes
+        self._pulses = pulses
+
+
+def _read_file(path, cache=None):
+    """
+    Read a single data file, using the cache if one is given.
+    """
+    if cache is not None:
+        return cache.read(path, _parse_file)
+    return _parse_file(path)
+
+
+def _parse_file(path):
+    """
+    Read and parse a single data file.
+    """
+    with instrumentation.timer("read"), open(path, "rb") as data_file:
+        raw = data_file.read()
+    _count_read(raw)
+    return parse_pulse_data(raw, source=path)
+
+
+def _count_read(raw):
+    """
+    Record a data file being opened and read.
+    """
+    if instrumentation.ENABLED:
+        instrumentation.count("files.opened")
+        instrumentation.count("bytes.read", len(raw))
+
+
+def _as_date(day):
+    """
+    Return the date part of a datetime, or the given date as is.
+    """
+    if isinstance(day, datetime.datetime):
+        return day.date()
+    return day
 
 
 class DataNotFound(ValueError):
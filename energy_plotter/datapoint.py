@@ -10,8 +10,13 @@ from conf import KWH_PER_PULSE
 class DataPoint():
     """
     A single measurement.
+
+    The values are stored in slots instead of an instance dictionary, as
+    large numbers of DataPoints are created when handling long time ranges.
     """
 
+    __slots__ = ("_timestamp", "_pulses", "_minute")
+
     def __init__(self, timestamp=None, pulses=None):
         """
         Create a new point of data.
@@ -21,6 +26,7 @@ class DataPoint():
         """
         self._timestamp = None
         self._pulses = None
+        self._minute = None
         self.timestamp = timestamp
         self.pulses = pulses
 
@@ -42,6 +48,27 @@ class DataPoint():
                              "".format(data_str, help_str))
         return cls(timestamp=parts[0], pulses=parts[1])
 
+    @classmethod
+    def from_validated(cls, timestamp, pulses, minute=None):
+        """
+        Return a new DataPoint for values that are known to be valid.
+
+        This is a cheap construction path for bulk data that has already been
+        validated: the values are stored as is, without the checks and
+        conversions done by the property setters.
+
+        :timestamp: datetime of the measurement
+        :pulses: non-negative integer pulse count
+        :minute: the timestamp as minutes since 1970-01-01 00:00, computed
+                 from the timestamp if not given
+        """
+        datapoint = cls.__new__(cls)
+        datapoint._timestamp = timestamp
+        datapoint._pulses = pulses
+        datapoint._minute = (_minute_index(timestamp) if minute is None
+                             else minute)
+        return datapoint
+
     @property
     def timestamp(self):
         """
@@ -67,15 +94,22 @@ class DataPoint():
         if new_timestamp is None:
             return
         if isinstance(new_timestamp, str):
-            self._timestamp = datetime.datetime.strptime(new_timestamp,
-                                                         "%Y-%m-%d-%H:%M")
-            return
-        if isinstance(new_timestamp, datetime.datetime):
-            self._timestamp = new_timestamp
-            return
+            new_timestamp = datetime.datetime.strptime(new_timestamp,
+                                                       "%Y-%m-%d-%H:%M")
+        if not isinstance(new_timestamp, datetime.datetime):
+            raise ValueError("Illegal timestamp value of type {} encountered."
+                             "".format(type(new_timestamp).__name__))
+        self._timestamp = new_timestamp
+        self._minute = _minute_index(new_timestamp)
 
-        raise ValueError("Illegal timestamp value of type {} encountered."
-                         "".format(type(new_timestamp).__name__))
+    @property
+    def minute(self):
+        """
+        Time of the observation as whole minutes since 1970-01-01 00:00
+        """
+        if self._minute is None:
+            raise NoValueForAttribute("Timestamp not set")
+        return self._minute
 
     @property
     def pulses(self):
@@ -151,6 +185,22 @@ class DataPoint():
         return hash(self._timestamp)
 
 
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MINUTE = datetime.timedelta(minutes=1)
+
+
+def _minute_index(timestamp):
+    """
+    Return the number of whole minutes from 1970-01-01 00:00 to a datetime.
+
+    Naive datetimes are taken as they are, aware ones are converted to UTC.
+    """
+    offset = timestamp.utcoffset()
+    if offset is not None:
+        timestamp = timestamp.replace(tzinfo=None) - offset
+    return (timestamp - _EPOCH) // _MINUTE
+
+
 class NoValueForAttribute(Exception):
     """
     Exception for situations when a value is not found for attribute
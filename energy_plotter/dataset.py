@@ -1,10 +1,18 @@
 """
-A class for pulse count data.
+Classes for pulse count data.
 """
 
+import datetime
+import operator
+
+import numpy as np
 from sortedcontainers import SortedSet
 
-from energy_plotter.datapoint import DataPoint
+from conf import KWH_PER_PULSE
+from energy_plotter import instrumentation
+from energy_plotter.aggregate import aggregate
+from energy_plotter.datapoint import DataPoint, NoValueForAttribute
+from energy_plotter.decimate import decimate_indices
 
 
 class DataSet(SortedSet):   # pylint: disable=too-many-ancestors
@@ -12,15 +20,34 @@ class DataSet(SortedSet):   # pylint: disable=too-many-ancestors
     A container class for storing pulse count data.
 
     The dataset is ordered by timestamp of the observation and cannot contain
-    duplicate measurements.
+    duplicate measurements. The ordering is based on the integer minute index
+    of the DataPoints, so that sorting and searching compare plain integers
+    instead of calling the rich comparison methods of DataPoint.
     """
 
+    def __init__(self, iterable=None, key=None):
+        """
+        Create a new dataset.
+
+        :iterable: DataPoints to add to the dataset
+        :key: ignored, the dataset is always ordered by the minute index
+        """
+        # pylint: disable=unused-argument
+        super().__init__(iterable, key=_MINUTE_KEY)
+        if instrumentation.ENABLED:
+            instrumentation.count("points.inserted", len(self))
+
     def add(self, value):
         """
         Add a new DataPoint to the dataset.
         """
         if not isinstance(value, DataPoint):
             raise TypeError("DataSet can only be used with DataPoints")
+        if value._minute is None:  # pylint: disable=protected-access
+            raise NoValueForAttribute("Cannot add a DataPoint without a "
+                                      "timestamp to a DataSet")
+        if instrumentation.ENABLED:
+            instrumentation.count("points.inserted")
         super().add(value)
 
     @property
@@ -43,3 +70,271 @@ class DataSet(SortedSet):   # pylint: disable=too-many-ancestors
         Return a list of kwh measurements in the dataset.
         """
         return [dp.kwh for dp in self]
+
+    def resample(self, bucket, how="sum", values="kwhs"):
+        """
+        Aggregate the data into time buckets.
+
+        See ColumnarDataSet.resample.
+        """
+        return ColumnarDataSet.from_datapoints(self).resample(bucket, how,
+                                                              values)
+
+
+class ColumnarDataSet():
+    """
+    A column-oriented container for pulse count data.
+
+    Offers the same read interface as DataSet, but instead of holding one
+    DataPoint object per measurement the data is stored as a sorted array of
+    minute resolution timestamps and an array of pulse counts. DataPoints are
+    only created when the dataset is iterated or indexed.
+
+    Like DataSet, the dataset is ordered by timestamp and cannot contain
+    duplicate measurements: if the same timestamp is given more than once,
+    the first occurrence is kept. The dataset is immutable and the arrays it
+    returns are read-only.
+
+    The kWh values are computed with the kWh per pulse constant of the
+    dataset, conf.KWH_PER_PULSE unless another one is given for a meter
+    with a different constant. DataPoints created from the dataset always
+    use conf.KWH_PER_PULSE.
+    """
+
+    def __init__(self, timestamps=None, pulses=None,
+                 kwh_per_pulse=KWH_PER_PULSE):
+        """
+        Create a new dataset.
+
+        :timestamps: sequence of datetimes or numpy datetime64 values
+        :pulses: sequence of non-negative pulse counts, one per timestamp
+        :kwh_per_pulse: energy corresponding to a single pulse
+        """
+        if timestamps is None:
+            timestamps = []
+        if pulses is None:
+            pulses = []
+        minutes = (np.asarray(timestamps, dtype="datetime64[m]")
+                   .astype(np.int64))
+        pulses = np.asarray(pulses)
+        if minutes.ndim != 1 or minutes.shape != pulses.shape:
+            raise ValueError("Timestamps and pulses must be one-dimensional "
+                             "sequences of equal length")
+        if pulses.size and (pulses.min() < 0 or pulses.max() > _MAX_PULSES):
+            raise ValueError("Pulse count must be between 0 and {}"
+                             "".format(_MAX_PULSES))
+        minutes, pulses = _sort_unique(minutes, pulses.astype(np.uint32))
+        self._minutes = _read_only(minutes)
+        self._pulses = _read_only(pulses)
+        self.kwh_per_pulse = kwh_per_pulse
+
+    @classmethod
+    def from_sorted(cls, minutes, pulses, kwh_per_pulse=KWH_PER_PULSE):
+        """
+        Create a dataset from already validated arrays without copying them.
+
+        This is the construction path for bulk loaders that have already
+        validated their input: no validation, sorting or deduplication is
+        done.
+
+        :minutes: strictly increasing int64 array of minutes since the epoch
+        :pulses: uint32 array of pulse counts
+        :kwh_per_pulse: energy corresponding to a single pulse
+        """
+        dataset = cls.__new__(cls)
+        dataset._minutes = _read_only(minutes)
+        dataset._pulses = _read_only(pulses)
+        dataset.kwh_per_pulse = kwh_per_pulse
+        return dataset
+
+    @classmethod
+    def from_datapoints(cls, datapoints):
+        """
+        Create a dataset from an iterable of DataPoints, e.g. a DataSet.
+        """
+        datapoints = list(datapoints)
+        return cls([dp.timestamp for dp in datapoints],
+                   [dp.pulses for dp in datapoints])
+
+    @classmethod
+    def concatenate(cls, datasets):
+        """
+        Combine several datasets into one.
+
+        Datasets that are given in timestamp order and don't overlap (e.g.
+        consecutive days) are joined without sorting. All the datasets must
+        have the same kWh per pulse constant.
+        """
+        datasets = list(datasets)
+        if not datasets:
+            return cls()
+        kwh_per_pulse = datasets[0].kwh_per_pulse
+        if any(dset.kwh_per_pulse != kwh_per_pulse for dset in datasets):
+            raise ValueError("Cannot concatenate datasets with different kWh "
+                             "per pulse constants")
+        minutes = np.concatenate([dset.minutes for dset in datasets])
+        pulses = np.concatenate([dset.pulses for dset in datasets])
+        return cls.from_sorted(*_sort_unique(minutes, pulses),
+                               kwh_per_pulse=kwh_per_pulse)
+
+    @property
+    def minutes(self):
+        """
+        Return the timestamps as integer minutes since 1970-01-01 00:00.
+        """
+        return self._minutes
+
+    @property
+    def timestamps(self):
+        """
+        Return an array of all the timestamps in the dataset.
+        """
+        return self._minutes.view("datetime64[m]")
+
+    @property
+    def pulses(self):
+        """
+        Return an array of all the pulse counts in the dataset.
+        """
+        return self._pulses
+
+    @property
+    def kwhs(self):
+        """
+        Return an array of kwh measurements in the dataset.
+        """
+        return self._pulses * self.kwh_per_pulse
+
+    def index(self, value):
+        """
+        Return the index of the given DataPoint or datetime in the dataset.
+
+        Raises a ValueError if the dataset doesn't contain the value.
+        """
+        minute = _minute_of(value)
+        position = np.searchsorted(self._minutes, minute)
+        if position < len(self) and self._minutes[position] == minute:
+            return int(position)
+        raise ValueError("{} is not in dataset".format(value))
+
+    def resample(self, bucket, how="sum", values="kwhs"):
+        """
+        Aggregate the data into time buckets.
+
+        :bucket: "15min", "hour", "day", "week", "month" or a number of
+                 minutes that divides a day evenly
+        :how: statistic computed for each bucket: "sum", "mean", "max",
+              "min" or "count"
+        :values: the values to aggregate, "kwhs" or "pulses"
+        :returns: Aggregate namedtuple of bucket start times and values,
+                  containing only the buckets with data
+        """
+        if values not in ("kwhs", "pulses"):
+            raise ValueError("Unknown values {!r}: use 'kwhs' or 'pulses'"
+                             "".format(values))
+        result = aggregate(self._minutes, self._pulses, bucket, how)
+        if values == "kwhs" and how != "count":
+            result = result._replace(
+                values=result.values * self.kwh_per_pulse)
+        return result
+
+    def decimate(self, n_out, method="lttb"):
+        """
+        Return a subset of the data reduced to roughly n_out points.
+
+        Meant for plotting long ranges: n_out should be about the width of
+        the plot in pixels. See energy_plotter.decimate for the methods.
+
+        :n_out: target number of points
+        :method: "lttb" or "minmax"
+        :returns: ColumnarDataSet containing the kept points
+        """
+        indices = decimate_indices(self._minutes, self._pulses, n_out, method)
+        return self.from_sorted(self._minutes[indices],
+                                self._pulses[indices], self.kwh_per_pulse)
+
+    def with_kwh_per_pulse(self, kwh_per_pulse):
+        """
+        Return the same data with another kWh per pulse constant.
+
+        The returned dataset shares the arrays of this one.
+        """
+        return self.from_sorted(self._minutes, self._pulses, kwh_per_pulse)
+
+    def to_dataset(self):
+        """
+        Return the data as a DataSet of DataPoints.
+        """
+        return DataSet(self)
+
+    def __len__(self):
+        return len(self._minutes)
+
+    def __iter__(self):
+        for minute, pulses in zip(self._minutes.tolist(),
+                                  self._pulses.tolist()):
+            yield _datapoint(minute, pulses)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.from_sorted(self._minutes[index], self._pulses[index],
+                                    self.kwh_per_pulse)
+        return _datapoint(int(self._minutes[index]), int(self._pulses[index]))
+
+    def __contains__(self, value):
+        try:
+            self.index(value)
+        except (ValueError, TypeError):
+            return False
+        return True
+
+    def __repr__(self):
+        if not self:
+            return "{}()".format(type(self).__name__)
+        return "{}({} points, {} - {})".format(
+            type(self).__name__, len(self), self.timestamps[0],
+            self.timestamps[-1])
+
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+# The slot behind DataPoint.minute, read directly to avoid the property call
+_MINUTE_KEY = operator.attrgetter("_minute")
+_MAX_PULSES = np.iinfo(np.uint32).max
+
+
+def _datapoint(minute, pulses):
+    return DataPoint.from_validated(
+        _EPOCH + datetime.timedelta(minutes=minute), pulses, minute)
+
+
+def _minute_of(value):
+    """
+    Return the minute index of a DataPoint or a datetime.
+    """
+    if isinstance(value, DataPoint):
+        value = value.timestamp
+    if not isinstance(value, (datetime.datetime, np.datetime64)):
+        raise TypeError("Cannot locate a value of type {} in a dataset"
+                        "".format(type(value).__name__))
+    return np.datetime64(value, "m").astype(np.int64)
+
+
+def _sort_unique(minutes, pulses):
+    """
+    Return the arrays ordered by minute, keeping the first of any duplicates.
+    """
+    if minutes.size < 2 or (np.diff(minutes) > 0).all():
+        return minutes, pulses
+    order = np.argsort(minutes, kind="stable")
+    minutes = minutes[order]
+    pulses = pulses[order]
+    keep = np.empty(minutes.size, dtype=bool)
+    keep[0] = True
+    np.not_equal(minutes[1:], minutes[:-1], out=keep[1:])
+    return minutes[keep], pulses[keep]
+
+
+def _read_only(array):
+    view = array.view()
+    view.flags.writeable = False
+    return view
@@ -0,0 +1,119 @@
+"""
+Downsampling of long series for plotting.
+
+A plot can't show more points than it has pixel columns, so series much
+longer than the plot width are reduced before plotting. Both methods pick a
+subset of the original points, so peaks remain at their true values:
+
+- lttb: Largest-Triangle-Three-Buckets, which splits the series into
+  buckets and from each picks the point forming the largest triangle with
+  the point picked from the previous bucket and the average of the next one.
+  This keeps the visual shape of the series with one point per bucket.
+- minmax: the minimum and maximum point of each pixel column, which keeps
+  the full vertical extent of each column of the plot.
+"""
+
+import numpy as np
+
+
+METHODS = ("lttb", "minmax")
+
+
+def decimate_indices(x, y, n_out, method="lttb"):
+    """
+    Return the indices of the points kept when decimating a series.
+
+    :x: sorted array of x coordinates (e.g. minutes since epoch)
+    :y: array of y coordinates
+    :n_out: target number of points, which for minmax is the number of
+            pixel columns, resulting in up to two points per column
+    :method: "lttb" or "minmax"
+    :returns: sorted int array of indices into x and y
+    """
+    if method == "lttb":
+        return lttb_indices(x, y, n_out)
+    if method == "minmax":
+        return minmax_indices(x, y, n_out)
+    raise ValueError("Unknown decimation method {!r}: use one of {}"
+                     "".format(method, ", ".join(METHODS)))
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Return the indices of the points picked by Largest-Triangle-Three-Buckets.
+
+    The first and last point are always kept.
+
+    :x: sorted array of x coordinates
+    :y: array of y coordinates
+    :n_out: number of points to keep
+    :returns: sorted int array of n_out indices, or of all indices if the
+              series isn't longer than n_out
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    length = len(x)
+    if n_out >= length or n_out < 3:
+        return np.arange(length)
+
+    # Bucket i covers indices edges[i]:edges[i + 1], excluding the first and
+    # the last point which have buckets of their own
+    edges = (np.arange(n_out - 1) * (length - 2) / (n_out - 2)).astype(
+        np.int64) + 1
+    edges[-1] = length - 1
+    x_means = np.append(np.add.reduceat(x[:-1], edges[:-1])
+                        / np.diff(edges), x[-1])
+    y_means = np.append(np.add.reduceat(y[:-1], edges[:-1])
+                        / np.diff(edges), y[-1])
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = length - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        areas = np.abs(
+            (x[previous] - x_means[bucket + 1]) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (y_means[bucket + 1]
+                                              - y[previous]))
+        previous = start + int(np.argmax(areas))
+        indices[bucket + 1] = previous
+    return indices
+
+
+def minmax_indices(x, y, n_columns):
+    """
+    Return the indices of the minimum and maximum points of each column.
+
+    The x range is split into n_columns columns of equal width, and the
+    points with the smallest and the largest y value of each column are kept.
+
+    :x: sorted array of x coordinates
+    :y: array of y coordinates
+    :n_columns: number of columns
+    :returns: sorted int array of at most 2 * n_columns indices, or of all
+              indices if the series isn't longer than that
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y)
+    length = len(x)
+    if length <= 2 * n_columns or n_columns < 1:
+        return np.arange(length)
+
+    span = x[-1] - x[0]
+    if span:
+        columns = np.minimum(
+            ((x - x[0]) * n_columns / span).astype(np.int64), n_columns - 1)
+    else:
+        columns = np.zeros(length, dtype=np.int64)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(columns)) + 1))
+    counts = np.diff(np.append(starts, length))
+    column_ids = np.repeat(np.arange(len(starts)), counts)
+
+    picked = []
+    for ufunc in (np.minimum, np.maximum):
+        extremes = np.repeat(ufunc.reduceat(y, starts), counts)
+        candidates = np.flatnonzero(y == extremes)
+        _, first = np.unique(column_ids[candidates], return_index=True)
+        picked.append(candidates[first])
+    return np.unique(np.concatenate(picked))
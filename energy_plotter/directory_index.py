@@ -0,0 +1,96 @@
+"""
+Index of the daily data files in a data directory.
+"""
+
+import datetime
+import os
+import time
+
+from energy_plotter import instrumentation
+
+
+class DirectoryIndex():
+    """
+    Mapping from dates to the data files available for them.
+
+    The directory is listed once and listed again only when its modification
+    time changes, so looking up the files of a day doesn't touch the
+    filesystem beyond a single stat call.
+    """
+
+    # Directory modification times closer to the scan time than this are not
+    # trusted, as on filesystems with coarse timestamps a file added right
+    # after the scan could leave the modification time unchanged.
+    MTIME_RESOLUTION = 2
+
+    def __init__(self, datadir):
+        """
+        Create an index for the data files in the given directory.
+
+        :datadir: location of the data files
+        """
+        self.datadir = datadir
+        self._files = {}
+        self._mtime = None
+
+    def files(self, day):
+        """
+        Return a list of paths to the data files of the given day.
+
+        :day: date or datetime representation of the day
+        """
+        self.refresh()
+        if isinstance(day, datetime.datetime):
+            day = day.date()
+        return list(self._files.get(day, ()))
+
+    def days(self):
+        """
+        Return a sorted list of the days with at least one data file.
+        """
+        self.refresh()
+        return sorted(self._files)
+
+    def refresh(self, force=False):
+        """
+        Scan the directory again if it has changed since the last scan.
+
+        :force: scan the directory regardless of its modification time
+        """
+        try:
+            mtime = os.stat(self.datadir).st_mtime_ns
+        except FileNotFoundError:
+            self._files = {}
+            self._mtime = None
+            return
+        if force or mtime != self._mtime:
+            self._scan()
+            recent = time.time() - mtime / 1e9 < self.MTIME_RESOLUTION
+            self._mtime = None if recent else mtime
+
+    def _scan(self):
+        """
+        List the directory and group the data files by date.
+
+        Files are expected to be named with the date in format YYYY-mm-dd
+        followed by an extension. Other files are ignored.
+        """
+        instrumentation.count("index.scans")
+        files = {}
+        with instrumentation.timer("index.scan"), \
+                os.scandir(self.datadir) as entries:
+            for entry in entries:
+                date_str, separator, _ = entry.name.partition(".")
+                if not separator or not entry.is_file():
+                    continue
+                try:
+                    day = datetime.datetime.strptime(date_str,
+                                                     "%Y-%m-%d").date()
+                except ValueError:
+                    continue
+                if day.strftime("%Y-%m-%d") != date_str:
+                    continue
+                files.setdefault(day, []).append(entry.path)
+        for paths in files.values():
+            paths.sort()
+        self._files = files
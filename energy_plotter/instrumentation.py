@@ -0,0 +1,165 @@
+"""
+Opt-in timers and counters for the stages of reading and plotting data.
+
+Instrumentation is disabled by default, and while disabled each hook costs a
+single flag check. It is enabled either with enable() or by setting the
+environment variable ENERGY_PLOTTER_INSTRUMENT before importing the package,
+in which case the summary is written as JSON when the program exits: to
+standard error if the variable is "1" or "stderr", otherwise to the file
+named by the variable.
+
+The recorded stages are:
+
+- timers: index.scan (listing the data directory), read (reading data
+  files), parse (parsing data), plot.render (drawing a plot) and plot.save
+  (writing a plot to a file)
+- counters: index.scans, files.opened, bytes.read, lines.parsed,
+  lines.slow_path (lines parsed one at a time), points.inserted (DataPoints
+  added to DataSets), cache.hits, cache.misses and plots.rendered
+
+Stages run in worker processes (e.g. batch_day_graphs or read_range with
+processes=True) are not recorded.
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+
+ENVIRONMENT_VARIABLE = "ENERGY_PLOTTER_INSTRUMENT"
+
+# Checked by the hooks before recording anything
+ENABLED = False
+
+_LOCK = threading.Lock()
+_TIMERS = {}
+_COUNTERS = {}
+
+
+def enable():
+    """
+    Start recording timers and counters.
+    """
+    global ENABLED  # pylint: disable=global-statement
+    ENABLED = True
+
+
+def disable():
+    """
+    Stop recording. The values recorded so far are kept.
+    """
+    global ENABLED  # pylint: disable=global-statement
+    ENABLED = False
+
+
+def reset():
+    """
+    Forget all recorded values.
+    """
+    with _LOCK:
+        _TIMERS.clear()
+        _COUNTERS.clear()
+
+
+def timer(name):
+    """
+    Return a context manager recording the time spent in a stage.
+
+    :name: name of the stage
+    """
+    if not ENABLED:
+        return _NULL_TIMER
+    return _Timer(name)
+
+
+def count(name, amount=1):
+    """
+    Increment a counter.
+
+    Hooks in hot paths should check ENABLED before calling this.
+
+    :name: name of the counter
+    :amount: amount to add
+    """
+    if not ENABLED:
+        return
+    with _LOCK:
+        _COUNTERS[name] = _COUNTERS.get(name, 0) + amount
+
+
+def summary():
+    """
+    Return the recorded values.
+
+    :returns: dict with "timers", mapping each stage to its number of calls
+              and total time in seconds, and "counters", mapping each
+              counter to its value
+    """
+    with _LOCK:
+        return {
+            "timers": {name: {"calls": calls, "seconds": seconds}
+                       for name, (calls, seconds) in sorted(_TIMERS.items())},
+            "counters": dict(sorted(_COUNTERS.items())),
+            }
+
+
+def dump(outfile=None):
+    """
+    Write the summary as JSON.
+
+    :outfile: writable text file object, by default standard error
+    """
+    outfile = outfile or sys.stderr
+    json.dump(summary(), outfile, indent=2)
+    outfile.write("\n")
+
+
+class _Timer():
+    """
+    Context manager adding the time spent in its block to a stage.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self._start
+        with _LOCK:
+            calls, seconds = _TIMERS.get(self._name, (0, 0.0))
+            _TIMERS[self._name] = (calls + 1, seconds + elapsed)
+
+
+class _NullTimer():
+    """
+    Context manager doing nothing, used while instrumentation is disabled.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def _dump_at_exit(target):
+    if target in ("1", "stderr"):
+        dump()
+        return
+    with open(target, "w") as outfile:
+        dump(outfile)
+
+
+if os.environ.get(ENVIRONMENT_VARIABLE):
+    enable()
+    atexit.register(_dump_at_exit, os.environ[ENVIRONMENT_VARIABLE])
@@ -0,0 +1,192 @@
+"""
+Reading and combining the data of several meters.
+
+Each meter logs its data into a directory of its own and may have a kWh per
+pulse constant of its own. The data of all the meters is read concurrently
+and aligned on a shared minute grid, so that the consumption of each meter
+and the total consumption can be plotted and summed from a single dataset.
+"""
+
+import collections
+import concurrent.futures
+
+import numpy as np
+
+from energy_plotter.aggregate import aggregate
+from energy_plotter.data_reader import PulseReader
+
+
+Meter = collections.namedtuple("Meter", ["name", "datadir", "kwh_per_pulse"])
+Meter.__doc__ = """
+An energy meter logging its data into a directory.
+
+:name: name of the meter, e.g. "heat pump"
+:datadir: location of the data files of the meter
+:kwh_per_pulse: energy corresponding to a single pulse of the meter, e.g.
+                conf.KWH_PER_PULSE
+"""
+
+
+class MultiMeterReader():
+    """
+    Read the data of several meters at once.
+    """
+
+    def __init__(self, meters, cache_dir=None):
+        """
+        Create a reader for the given meters.
+
+        :meters: iterable of Meters with distinct names
+        :cache_dir: location for cached data, see PulseReader
+        """
+        self.meters = list(meters)
+        names = [meter.name for meter in self.meters]
+        if len(set(names)) != len(names):
+            raise ValueError("Meter names must be unique: {}".format(
+                ", ".join(names)))
+        self._readers = collections.OrderedDict(
+            (meter.name, PulseReader(meter.datadir, cache_dir=cache_dir,
+                                     kwh_per_pulse=meter.kwh_per_pulse))
+            for meter in self.meters)
+
+    def read_day(self, data_day, skip_missing=False):
+        """
+        Return the data of all the meters for a single day.
+
+        See read_range.
+        """
+        return self.read_range(data_day, data_day, skip_missing=skip_missing)
+
+    def read_range(self, start, end, workers=None, skip_missing=False):
+        """
+        Return the data of all the meters from start to end, inclusive.
+
+        The meters are read concurrently, each one as with
+        PulseReader.read_range.
+
+        :start: datetime representation of the first day
+        :end: datetime representation of the last day
+        :workers: maximum number of meters read simultaneously, by default
+                  all of them
+        :skip_missing: ignore days without data instead of raising
+                       DataNotFound
+        :returns: MultiMeterDataSet containing the data
+        """
+        def read_meter(reader):
+            return reader.read_range(start, end, skip_missing=skip_missing)
+
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=workers or len(self._readers) or 1) as executor:
+            datasets = list(executor.map(read_meter, self._readers.values()))
+        return MultiMeterDataSet(zip(self._readers, datasets))
+
+
+class MultiMeterDataSet():
+    """
+    The data of several meters aligned on a shared minute grid.
+
+    The grid contains every minute for which any of the meters has data. The
+    kWh values of the meters are stored as rows of a single array, with NaN
+    for the minutes without data from a meter.
+    """
+
+    def __init__(self, datasets):
+        """
+        Combine the data of several meters.
+
+        :datasets: iterable of (name, ColumnarDataSet) pairs, the datasets
+                   having the kWh per pulse constants of their meters
+        """
+        self._datasets = collections.OrderedDict(datasets)
+        minutes = [dataset.minutes for dataset in self._datasets.values()]
+        if not minutes:
+            grid = np.zeros(0, dtype=np.int64)
+        elif all(np.array_equal(minutes[0], other) for other in minutes[1:]):
+            grid = minutes[0]
+        else:
+            grid = np.unique(np.concatenate(minutes))
+        kwhs = np.full((len(minutes), len(grid)), np.nan)
+        for row, dataset in enumerate(self._datasets.values()):
+            kwhs[row, np.searchsorted(grid, dataset.minutes)] = dataset.kwhs
+        self._minutes = _read_only(grid)
+        self._kwhs = _read_only(kwhs)
+
+    @property
+    def names(self):
+        """
+        Return the names of the meters, in the order of the kwhs rows.
+        """
+        return list(self._datasets)
+
+    @property
+    def minutes(self):
+        """
+        Return the grid as integer minutes since 1970-01-01 00:00.
+        """
+        return self._minutes
+
+    @property
+    def timestamps(self):
+        """
+        Return the grid as an array of timestamps.
+        """
+        return self._minutes.view("datetime64[m]")
+
+    @property
+    def kwhs(self):
+        """
+        Return the kWh values as a meters x minutes array, NaN for minutes
+        without data from a meter.
+        """
+        return self._kwhs
+
+    @property
+    def total_kwhs(self):
+        """
+        Return the sum of the kWh values of all the meters for each minute.
+
+        Meters without data for a minute are left out of its sum.
+        """
+        return np.nansum(self._kwhs, axis=0)
+
+    def meter(self, name):
+        """
+        Return the data of a single meter as a ColumnarDataSet.
+        """
+        return self._datasets[name]
+
+    def meter_kwhs(self, name):
+        """
+        Return the kWh values of a single meter on the grid, NaN for minutes
+        without data from the meter.
+        """
+        return self._kwhs[self.names.index(name)]
+
+    def resample(self, bucket, how="sum", meter=None):
+        """
+        Aggregate the kWh values into time buckets.
+
+        :bucket: bucket size, see ColumnarDataSet.resample
+        :how: statistic computed for each bucket: "sum", "mean", "max",
+              "min" or "count"
+        :meter: name of the meter to aggregate, or None to aggregate the
+                total of all the meters
+        :returns: Aggregate namedtuple of bucket start times and values
+        """
+        if meter is not None:
+            return self._datasets[meter].resample(bucket, how)
+        return aggregate(self._minutes, self.total_kwhs, bucket, how)
+
+    def __len__(self):
+        return len(self._minutes)
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, ", ".join(
+            "{}: {} points".format(name, len(dataset))
+            for name, dataset in self._datasets.items()))
+
+
+def _read_only(array):
+    view = array.view()
+    view.flags.writeable = False
+    return view
@@ -0,0 +1,188 @@
+"""
+Bulk parser for pulse count data files.
+
+Instead of parsing the file one line at a time with DataPoint.from_string,
+the whole contents are decoded at once: the lines are laid out as rows of a
+fixed-width byte matrix, so that the fixed-width YYYY-mm-dd-HH:mm timestamps
+and the pulse counts following them can be decoded with column-wise NumPy
+arithmetic. Only lines that don't match the expected layout are passed on to
+DataPoint.from_string, which then either accepts them or reports the error.
+"""
+
+import numpy as np
+
+from energy_plotter import instrumentation
+from energy_plotter.datapoint import DataPoint
+from energy_plotter.dataset import ColumnarDataSet
+
+
+TIMESTAMP_WIDTH = len("YYYY-mm-dd-HH:mm")
+
+_MAX_PULSES = np.iinfo(np.uint32).max
+_MAX_DIGITS = len(str(_MAX_PULSES))
+_DIGIT_COLUMNS = (0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15)
+_SEPARATORS = {4: b"-", 7: b"-", 10: b"-", 13: b":"}
+_WHITESPACE = b" \t\v\f\r"
+_MAX_REPORTED_ERRORS = 10
+
+
+def parse_pulse_data(raw, source=None, first_line=1):
+    """
+    Parse the contents of a pulse count data file.
+
+    Each line must contain a timestamp (YYYY-mm-dd-HH:mm, e.g.
+    "2021-01-29-23:43") and the number of pulses separated with whitespace.
+    Rather than stopping at the first invalid line, all invalid lines are
+    collected and reported together in a single ParseError.
+
+    :raw: contents of the file as bytes or str
+    :source: name of the parsed file, used in error messages
+    :first_line: line number of the first line in raw, used in error
+                 messages when parsing a part of a file
+    :returns: ColumnarDataSet containing the data
+    """
+    with instrumentation.timer("parse"):
+        return _parse(raw, source, first_line)
+
+
+def _parse(raw, source, first_line):
+    """
+    Parse the contents of a data file, see parse_pulse_data.
+    """
+    if isinstance(raw, str):
+        raw = raw.encode()
+    lines = raw.split(b"\n")
+    if lines[-1] == b"":
+        lines.pop()
+    if not lines:
+        return ColumnarDataSet()
+
+    minutes, pulses, valid = _parse_fixed_width(lines)
+    slow_rows = np.flatnonzero(~valid).tolist()
+    if instrumentation.ENABLED:
+        instrumentation.count("lines.parsed", len(lines))
+        instrumentation.count("lines.slow_path", len(slow_rows))
+    errors = []
+    for row in slow_rows:
+        try:
+            minutes[row], pulses[row] = _parse_line(lines[row])
+        except ValueError as err:
+            errors.append((row + first_line, str(err)))
+    if errors:
+        raise ParseError(errors, source)
+    return ColumnarDataSet(minutes.view("datetime64[m]"), pulses)
+
+
+def _parse_fixed_width(lines):
+    """
+    Decode lines in the expected fixed-width layout.
+
+    :lines: list of lines as bytes
+    :returns: tuple of minute since epoch and pulse arrays, and a boolean
+              array telling which lines could be decoded
+    """
+    chars = np.array(lines, dtype=bytes)
+    if chars.itemsize <= TIMESTAMP_WIDTH:
+        chars = chars.astype("S{}".format(TIMESTAMP_WIDTH + 1))
+    chars = chars.view(np.uint8).reshape(len(lines), -1)
+
+    digits = chars[:, _DIGIT_COLUMNS].astype(np.int64) - ord("0")
+    valid = np.ones(len(lines), dtype=bool)
+    for column, separator in _SEPARATORS.items():
+        valid &= chars[:, column] == ord(separator)
+
+    minutes, timestamps_valid = _decode_timestamps(digits)
+    pulses, pulses_valid = _parse_counts(chars[:, TIMESTAMP_WIDTH:])
+    return minutes, pulses, valid & timestamps_valid & pulses_valid
+
+
+def _decode_timestamps(digits):
+    """
+    Convert the digits of YYYY-mm-dd-HH:mm timestamps to minutes since epoch.
+
+    :digits: integer matrix with the twelve digits of a timestamp on each row
+    :returns: int64 array of minutes and a boolean array telling which rows
+              contain a valid date and time
+    """
+    year = digits[:, 0:4] @ np.array([1000, 100, 10, 1])
+    month = digits[:, 4] * 10 + digits[:, 5]
+    day = digits[:, 6] * 10 + digits[:, 7]
+    hour = digits[:, 8] * 10 + digits[:, 9]
+    minute = digits[:, 10] * 10 + digits[:, 11]
+    valid = ((digits >= 0) & (digits <= 9)).all(axis=1)
+    valid &= (month >= 1) & (month <= 12) & (hour <= 23) & (minute <= 59)
+    month = np.where(valid, (year - 1970) * 12 + month - 1, 0)
+    month_start = month.astype("datetime64[M]").astype("datetime64[D]")
+    next_month_start = (month + 1).astype("datetime64[M]").astype(
+        "datetime64[D]")
+    valid &= (day >= 1) & (day <= (next_month_start - month_start)
+                           .astype(np.int64))
+    minutes = ((month_start.astype(np.int64) + day - 1) * 24 * 60
+               + hour * 60 + minute)
+    return minutes, valid
+
+
+def _parse_counts(chars):
+    """
+    Decode whitespace-prefixed pulse counts from a byte matrix.
+
+    :chars: the part of the line matrix that follows the timestamps
+    :returns: uint32 array of pulse counts and a boolean array telling which
+              rows contain a single valid count
+    """
+    is_digit = (chars >= ord("0")) & (chars <= ord("9"))
+    is_space = np.isin(chars, np.frombuffer(_WHITESPACE, dtype=np.uint8))
+    is_padding = chars == 0
+    digit_run_starts = is_digit.copy()
+    digit_run_starts[:, 1:] &= ~is_digit[:, :-1]
+    digit_count = is_digit.sum(axis=1)
+    valid = ((is_digit | is_space | is_padding).all(axis=1)
+             & is_space[:, 0]
+             & (digit_run_starts.sum(axis=1) == 1)
+             & (digit_count <= _MAX_DIGITS))
+
+    counts = np.zeros(len(chars), dtype=np.int64)
+    for column in range(chars.shape[1]):
+        column_digits = is_digit[:, column]
+        if column_digits.any():
+            counts = np.where(column_digits,
+                              counts * 10 + chars[:, column] - ord("0"),
+                              counts)
+    valid &= counts <= _MAX_PULSES
+    return np.where(valid, counts, 0).astype(np.uint32), valid
+
+
+def _parse_line(line):
+    """
+    Parse a single line that doesn't follow the fixed-width layout.
+
+    :returns: tuple of minute since epoch and pulse count
+    """
+    datapoint = DataPoint.from_string(line.decode(errors="replace"))
+    if datapoint.pulses > _MAX_PULSES:
+        raise ValueError("Pulse count cannot be larger than {}"
+                         "".format(_MAX_PULSES))
+    timestamp = np.datetime64(datapoint.timestamp, "m")
+    return timestamp.astype(np.int64), datapoint.pulses
+
+
+class ParseError(ValueError):
+    """
+    Error for data files containing one or more invalid lines.
+
+    The line numbers and error messages of all invalid lines are available in
+    the errors attribute as a list of (line number, message) tuples.
+    """
+
+    def __init__(self, errors, source=None):
+        self.errors = errors
+        self.source = source
+        details = "; ".join("line {}: {}".format(line, message)
+                            for line, message
+                            in errors[:_MAX_REPORTED_ERRORS])
+        if len(errors) > _MAX_REPORTED_ERRORS:
+            details += "; ... ({} more)".format(
+                len(errors) - _MAX_REPORTED_ERRORS)
+        super().__init__("{} invalid line{} in {}: {}".format(
+            len(errors), "" if len(errors) == 1 else "s",
+            source or "data", details))
@@ -1,12 +1,20 @@
 """
 Tool for plotting data from a time range.
+
+Matplotlib is imported only when a plot is rendered, so that importing this
+module (or the package) for working with the data doesn't pay for importing
+it. Figures are rendered on the non-interactive Agg canvas without pyplot,
+regardless of the pyplot backend in use.
 """
 
+import concurrent.futures
 import datetime
-import matplotlib.dates
-import matplotlib.pyplot as plt
+import io
+import os
+import threading
 
-from energy_plotter.data_reader import PulseReader
+from energy_plotter import instrumentation
+from energy_plotter.data_reader import DataNotFound, PulseReader
 
 
 class Plot():
@@ -14,35 +22,234 @@ class Plot():
     Create plots for specific time range.
     """
 
-    def __init__(self, datadir):
+    def __init__(self, datadir, cache_dir=None):
         """
         Create a plot tool for data in specific directory.
+
+        :datadir: location of the data files
+        :cache_dir: location for cached data, see PulseReader
         """
-        self._reader = PulseReader(datadir)
+        self._reader = PulseReader(datadir, cache_dir=cache_dir)
+        self._cache_dir = cache_dir
+        self._follower = None
+        self._day_figure = None
 
     def day_graph(self, date, outfile):
         """
         Produce a line graph of the energy data for a day.
 
         Create a line graph for all available data gathered during a single
-        day.
+        day. The data file of the current day is read incrementally, so that
+        repeatedly plotting it only parses the lines added in between.
 
         :start: datetime.date of the day for which the plot is created
         :outile: file in which the plot is to be written
         """
-        data = self._reader.read_day(date)
-        fig, ax = plt.subplots()  # pylint: disable=unused_variable
-        ax.plot(data.timestamps, data.kwhs, color="k", linewidth=0.75)
-        ax.xaxis.set_major_locator(matplotlib.dates.HourLocator(interval=3))
-        ax.xaxis.set_minor_locator(matplotlib.dates.HourLocator())
-        ax.xaxis.set_major_formatter(matplotlib.dates.DateFormatter("%H:%M"))
-        ax.set_xlim([self._day_start(date),
-                     self._day_start(date + datetime.timedelta(days=1))])
+        if self._day_figure is None:
+            self._day_figure = _DayFigure()
+        self._day_figure.render(date, self._day_data(date), outfile)
+
+    def batch_day_graphs(self, dates, outdir, workers=None,
+                         skip_missing=False):
+        """
+        Produce day graphs for many days in parallel.
+
+        The graphs are rendered in a process pool, each worker reusing a
+        single figure for all the graphs it renders. The graph of each day is
+        written to outdir as YYYY-mm-dd.png.
+
+        :dates: iterable of datetime.dates to plot
+        :outdir: directory in which the plots are to be written
+        :workers: number of worker processes, by default the number of CPUs
+        :skip_missing: skip days without data instead of raising DataNotFound
+        :returns: list of paths to the written plots
+        """
+        tasks = [(date, os.path.join(outdir, date.strftime("%Y-%m-%d.png")))
+                 for date in dates]
+        if not tasks:
+            return []
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(tasks) // (4 * workers))
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker,
+                initargs=(self._reader.datadir, self._cache_dir,
+                          skip_missing)) as executor:
+            written = executor.map(_render_day, tasks, chunksize=chunksize)
+            return [path for path in written if path is not None]
+
+    def range_graph(self, start, end, outfile, decimation="minmax"):
+        """
+        Produce a line graph of the energy data for a range of days.
+
+        Long ranges contain far more data points than the plot has pixels,
+        so the data is decimated to the pixel width of the plot before
+        drawing.
+
+        :start: datetime.date of the first day to plot
+        :end: datetime.date of the last day to plot
+        :outfile: file in which the plot is to be written
+        :decimation: decimation method, "minmax" or "lttb", or None to plot
+                     all points
+        """
+        data = self._reader.read_range(start, end, skip_missing=True)
+        _render_range(start, end, data, outfile, decimation)
+
+    def _day_data(self, date):
+        """
+        Return the data of a day, following the data file of the current day.
+        """
+        if date != datetime.date.today():
+            return self._reader.read_day(date)
+        if self._follower is None or self._follower.day != date:
+            self._follower = self._reader.follow(date)
+        return self._follower.refresh()
+
+
+class _DayFigure():
+    """
+    A reusable figure for day graphs.
+
+    The axes, locators, formatters and labels are set up once, and rendering
+    a day only replaces the line data, the x range and the title. The figure
+    is not managed by pyplot, so it is freed when no longer referenced.
+    """
+
+    def __init__(self):
+        mpl = _matplotlib()
+        self.figure = _new_figure()
+        ax = self.figure.add_subplot(1, 1, 1)
+        ax.xaxis_date()
+        self._line, = ax.plot([], [], color="k", linewidth=0.75)
+        ax.xaxis.set_major_locator(mpl.dates.HourLocator(interval=3))
+        ax.xaxis.set_minor_locator(mpl.dates.HourLocator())
+        ax.xaxis.set_major_formatter(mpl.dates.DateFormatter("%H:%M"))
         ax.set_xlabel("kellonaika")
         ax.set_ylabel("kWh")
-        ax.set_title(
-                date.strftime("Minuuttikohtainen energiankulutus %d.%m.%Y"))
-        plt.savefig(outfile)
+        self._ax = ax
+
+    def render(self, date, data, outfile):
+        """
+        Draw the data of a day and write the figure to a file.
+        """
+        with instrumentation.timer("plot.render"):
+            self._line.set_data(data.timestamps, data.kwhs)
+            self._ax.set_xlim([_day_start(date),
+                               _day_start(date + datetime.timedelta(days=1))])
+            self._ax.relim()
+            self._ax.autoscale_view(scalex=False)
+            self._ax.set_title(date.strftime(
+                "Minuuttikohtainen energiankulutus %d.%m.%Y"))
+        with instrumentation.timer("plot.save"):
+            self.figure.savefig(outfile)
+        instrumentation.count("plots.rendered")
+
+
+# State of a batch rendering worker process, set by _init_worker
+_WORKER = {}
+# Figures of threads rendering with render_png
+_THREAD = threading.local()
+
+
+def _init_worker(datadir, cache_dir, skip_missing):
+    _WORKER["reader"] = PulseReader(datadir, cache_dir=cache_dir)
+    _WORKER["figure"] = _DayFigure()
+    _WORKER["skip_missing"] = skip_missing
+
+
+def _render_day(task):
+    """
+    Render the day graph of a date in a worker process.
+
+    :task: tuple of the date and the output path
+    :returns: the output path, or None if there was no data to plot
+    """
+    date, outfile = task
+    try:
+        data = _WORKER["reader"].read_day(date)
+    except DataNotFound:
+        if _WORKER["skip_missing"]:
+            return None
+        raise
+    _WORKER["figure"].render(date, data, outfile)
+    return outfile
+
+
+def render_png(task):
+    """
+    Render a graph of given data and return it as PNG bytes.
+
+    Meant for rendering in worker threads or processes: each thread reuses
+    a day figure of its own.
+
+    :task: ("day", date, data) for a day graph, or ("range", start, end,
+           data, decimation) for a range graph, data being a
+           ColumnarDataSet and the rest as for Plot.day_graph and
+           Plot.range_graph
+    :returns: the image as bytes
+    """
+    graph, args = task[0], task[1:]
+    output = io.BytesIO()
+    if graph == "day":
+        date, data = args
+        if getattr(_THREAD, "day_figure", None) is None:
+            _THREAD.day_figure = _DayFigure()
+        _THREAD.day_figure.render(date, data, output)
+    elif graph == "range":
+        start, end, data, decimation = args
+        _render_range(start, end, data, output, decimation)
+    else:
+        raise ValueError("Unknown graph {!r}".format(graph))
+    return output.getvalue()
+
+
+def _render_range(start, end, data, outfile, decimation):
+    """
+    Draw the data of a range of days and write the figure to a file.
+    """
+    with instrumentation.timer("plot.render"):
+        mpl = _matplotlib()
+        fig = _new_figure()
+        ax = fig.add_subplot(1, 1, 1)
+        if decimation is not None:
+            width = int(ax.get_window_extent().width)
+            data = data.decimate(width, decimation)
+        ax.plot(data.timestamps, data.kwhs, color="k", linewidth=0.75)
+        locator = mpl.dates.AutoDateLocator()
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(
+            mpl.dates.ConciseDateFormatter(locator))
+        ax.set_xlim([_day_start(start),
+                     _day_start(end + datetime.timedelta(days=1))])
+        ax.set_xlabel("aika")
+        ax.set_ylabel("kWh")
+        ax.set_title("Minuuttikohtainen energiankulutus {}–{}".format(
+            start.strftime("%d.%m.%Y"), end.strftime("%d.%m.%Y")))
+    with instrumentation.timer("plot.save"):
+        fig.savefig(outfile)
+    instrumentation.count("plots.rendered")
+
+
+def _matplotlib():
+    """
+    Import and return the matplotlib modules needed for plotting.
+    """
+    # pylint: disable=import-outside-toplevel
+    import matplotlib
+    import matplotlib.backends.backend_agg
+    import matplotlib.dates
+    import matplotlib.figure
+    return matplotlib
+
+
+def _new_figure():
+    """
+    Return a new figure drawn on an Agg canvas and not managed by pyplot.
+    """
+    mpl = _matplotlib()
+    figure = mpl.figure.Figure()
+    mpl.backends.backend_agg.FigureCanvasAgg(figure)
+    return figure
+
 
-    def _day_start(self, date):  # pylint: disable=no-self-use
-        return datetime.datetime(date.year, date.month, date.day, 0, 0)
+def _day_start(date):
+    return datetime.datetime(date.year, date.month, date.day, 0, 0)
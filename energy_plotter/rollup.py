@@ -0,0 +1,231 @@
+"""
+Precomputed hourly and daily summaries of pulse count data.
+
+Summarizing long time ranges from minute data means reading every minute of
+the range. A RollupStore keeps the pulse totals, minimum and maximum minute
+pulse counts, and the number of minutes with data for every hour and every
+day on disk, so that long range summaries can be computed from a few
+thousand precomputed values instead.
+"""
+
+import datetime
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from conf import KWH_PER_PULSE
+from energy_plotter.aggregate import Aggregate, aggregate, BUCKET_MINUTES
+
+
+RESOLUTIONS = ("hour", "day")
+STATISTICS = ("sum", "min", "max", "count")
+
+_ROLLUP_FILE = "rollups.npz"
+_MANIFEST_FILE = "manifest.json"
+_MINUTES_PER_DAY = BUCKET_MINUTES["day"]
+# Requested buckets that can be computed from each rollup, coarsest first
+_SERVED_BUCKETS = (
+    ("day", ("day", "week", "month")),
+    ("hour", ("hour",)),
+    )
+# How each statistic is combined when merging rollup buckets
+_COMBINE = {"sum": "sum", "min": "min", "max": "max", "count": "sum"}
+
+
+class RollupStore():
+    """
+    Persistent hourly and daily rollups of the data read by a PulseReader.
+
+    The rollups are brought up to date with update(), which only reads the
+    data files that have been added or changed since the previous update.
+    """
+
+    def __init__(self, reader, path):
+        """
+        Create a rollup store.
+
+        :reader: PulseReader for the daily data files
+        :path: directory for the rollup files, created if needed
+        """
+        self._reader = reader
+        self.path = path
+        self._rollups = None
+        self._manifest = None
+
+    def update(self):
+        """
+        Update the rollups to match the current data files.
+
+        :returns: sorted list of the days whose rollups were recomputed or
+                  removed
+        """
+        self._load()
+        sources = {day.strftime("%Y-%m-%d"): _file_signature(path)
+                   for day, path in self._reader.data_files()}
+        changed = sorted(day for day in set(sources) | set(self._manifest)
+                         if sources.get(day) != self._manifest.get(day))
+        if not changed:
+            return []
+
+        changed_days = [datetime.datetime.strptime(day, "%Y-%m-%d").date()
+                        for day in changed]
+        day_numbers = np.array([_day_number(day) for day in changed_days])
+        new_rollups = [self._compute(day) for day in changed_days
+                       if day.strftime("%Y-%m-%d") in sources]
+        for resolution in RESOLUTIONS:
+            columns = self._rollups[resolution]
+            keep = ~np.isin(columns["starts"] // _MINUTES_PER_DAY,
+                            day_numbers)
+            parts = [{name: values[keep] for name, values in columns.items()}]
+            parts += [rollup[resolution] for rollup in new_rollups]
+            merged = {name: np.concatenate([part[name] for part in parts])
+                      for name in columns}
+            order = np.argsort(merged["starts"], kind="stable")
+            self._rollups[resolution] = {name: values[order]
+                                         for name, values in merged.items()}
+        self._manifest = sources
+        self._save()
+        return changed_days
+
+    def query(self, start, end, bucket="day", how="sum", values="kwhs"):
+        """
+        Return aggregated data for the days from start to end, inclusive.
+
+        The coarsest rollup from which the requested buckets can be computed
+        is used: daily rollups for daily, weekly and monthly buckets, hourly
+        rollups for hourly buckets. Finer buckets are computed from the
+        minute data. The rollups are not updated automatically, see update.
+
+        :start: datetime representation of the first day
+        :end: datetime representation of the last day
+        :bucket: bucket size, see energy_plotter.aggregate.bucket_starts
+        :how: statistic computed for each bucket: "sum", "mean", "max",
+              "min" or "count"
+        :values: the values to aggregate, "kwhs" or "pulses"
+        :returns: Aggregate namedtuple of bucket start times and values
+        """
+        if values not in ("kwhs", "pulses"):
+            raise ValueError("Unknown values {!r}: use 'kwhs' or 'pulses'"
+                             "".format(values))
+        resolution = self.resolution_for(bucket)
+        if resolution is None:
+            return self._reader.read_range(
+                start, end, skip_missing=True).resample(bucket, how, values)
+
+        self._load()
+        columns = self._rollups[resolution]
+        first, last = np.searchsorted(
+            columns["starts"], [_day_number(start) * _MINUTES_PER_DAY,
+                                (_day_number(end) + 1) * _MINUTES_PER_DAY])
+        starts = columns["starts"][first:last]
+        if how == "mean":
+            sums = aggregate(starts, columns["sum"][first:last], bucket)
+            counts = aggregate(starts, columns["count"][first:last], bucket)
+            result = Aggregate(sums.starts, sums.values / counts.values)
+        elif how in _COMBINE:
+            result = aggregate(starts, columns[how][first:last], bucket,
+                               _COMBINE[how])
+        else:
+            raise ValueError("Unknown aggregation {!r}".format(how))
+        if values == "kwhs" and how != "count":
+            result = result._replace(values=result.values * KWH_PER_PULSE)
+        return result
+
+    @staticmethod
+    def resolution_for(bucket):
+        """
+        Return the rollup resolution used for a bucket size, or None if the
+        buckets must be computed from the minute data.
+        """
+        for resolution, buckets in _SERVED_BUCKETS:
+            if bucket in buckets or (
+                    isinstance(bucket, int) and bucket > 0
+                    and bucket % BUCKET_MINUTES[resolution] == 0):
+                return resolution
+        return None
+
+    def _compute(self, day):
+        """
+        Return the rollups of a single day.
+        """
+        data = self._reader.read_day(day)
+        day_start = _day_number(day) * _MINUTES_PER_DAY
+        first, last = np.searchsorted(
+            data.minutes, [day_start, day_start + _MINUTES_PER_DAY])
+        minutes = data.minutes[first:last]
+        pulses = data.pulses[first:last]
+        rollups = {}
+        for resolution in RESOLUTIONS:
+            columns = {name: aggregate(minutes, pulses, resolution, name)
+                       for name in STATISTICS}
+            rollups[resolution] = dict(
+                {name: result.values for name, result in columns.items()},
+                starts=columns["sum"].starts.astype(np.int64))
+        return rollups
+
+    def _load(self):
+        """
+        Read the rollups and the manifest from disk if not read already.
+        """
+        if self._rollups is not None:
+            return
+        self._rollups = {resolution: _empty_columns()
+                         for resolution in RESOLUTIONS}
+        self._manifest = {}
+        try:
+            with open(os.path.join(self.path,
+                                   _MANIFEST_FILE)) as manifest_file:
+                manifest = json.load(manifest_file)
+            with np.load(os.path.join(self.path, _ROLLUP_FILE)) as rollups:
+                for resolution in RESOLUTIONS:
+                    self._rollups[resolution] = {
+                        name: rollups["{}_{}".format(resolution, name)]
+                        for name in self._rollups[resolution]}
+        except FileNotFoundError:
+            return
+        self._manifest = {day: tuple(signature)
+                          for day, signature in manifest.items()}
+
+    def _save(self):
+        """
+        Write the rollups and then the manifest to disk.
+
+        If writing is interrupted between the two, the next update recomputes
+        the days that were updated.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        arrays = {"{}_{}".format(resolution, name): values
+                  for resolution, columns in self._rollups.items()
+                  for name, values in columns.items()}
+        with tempfile.NamedTemporaryFile(dir=self.path, suffix=".tmp",
+                                         delete=False) as tmp_file:
+            np.savez(tmp_file, **arrays)
+        os.replace(tmp_file.name, os.path.join(self.path, _ROLLUP_FILE))
+        with tempfile.NamedTemporaryFile("w", dir=self.path, suffix=".tmp",
+                                         delete=False) as tmp_file:
+            json.dump(self._manifest, tmp_file)
+        os.replace(tmp_file.name, os.path.join(self.path, _MANIFEST_FILE))
+
+
+def _empty_columns():
+    return {"starts": np.zeros(0, dtype=np.int64),
+            "sum": np.zeros(0, dtype=np.int64),
+            "min": np.zeros(0, dtype=np.int64),
+            "max": np.zeros(0, dtype=np.int64),
+            "count": np.zeros(0, dtype=np.int64)}
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return (path, stat.st_size, stat.st_mtime_ns)
+
+
+def _day_number(day):
+    """
+    Return the number of days from 1970-01-01 to the given day.
+    """
+    if isinstance(day, datetime.datetime):
+        day = day.date()
+    return (day - datetime.date(1970, 1, 1)).days
@@ -0,0 +1,288 @@
+"""
+HTTP server for plots and aggregates of pulse count data.
+
+A small asyncio HTTP server for dashboards, using only the standard library.
+It serves the following GET endpoints:
+
+- /day/YYYY-mm-dd.png: the day graph of a day
+- /range/YYYY-mm-dd/YYYY-mm-dd.png: the range graph of the days from the
+  first to the last date, inclusive, with an optional decimation parameter
+  ("minmax", "lttb" or "none")
+- /aggregate.json and /aggregate.csv: aggregated data, with parameters
+  start and end (YYYY-mm-dd, inclusive), bucket (as for
+  ColumnarDataSet.resample, default "day"), how (default "sum") and values
+  ("kwhs" or "pulses", default "kwhs")
+
+Parsed datasets and rendered images are kept in LRU caches keyed by the
+sizes and modification times of the data files they were made from, so that
+a changed data file (e.g. that of the current day) is read and plotted
+again on the next request. Reading is done in a thread pool and rendering in
+a process pool, so a request being rendered doesn't block the others.
+
+Run with
+
+    python -m energy_plotter.server DATADIR [--port PORT]
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import datetime
+import functools
+import io
+import json
+import os
+import urllib.parse
+
+import numpy as np
+
+from energy_plotter.cache import LRUCache
+from energy_plotter.data_reader import DataNotFound, PulseReader
+from energy_plotter.decimate import METHODS
+from energy_plotter.parser import ParseError
+from energy_plotter.plot import render_png
+from energy_plotter.stream import write_csv
+
+
+class PlotServer():
+    """
+    HTTP server for plots and aggregates of the data in a directory.
+    """
+
+    def __init__(self, datadir, cache_dir=None, workers=None,
+                 image_cache_size=128, data_cache_size=16):
+        """
+        Create a server.
+
+        :datadir: location of the data files
+        :cache_dir: location for cached data, see PulseReader
+        :workers: number of rendering processes, by default the number of
+                  CPUs
+        :image_cache_size: number of rendered images kept in memory
+        :data_cache_size: number of parsed datasets kept in memory
+        """
+        self._reader = PulseReader(datadir, cache_dir=cache_dir)
+        self._workers = workers
+        self.images = LRUCache(image_cache_size)
+        self.datasets = LRUCache(data_cache_size)
+        self._executor = None
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=8080):
+        """
+        Start accepting connections.
+
+        :host: address to listen on
+        :port: port to listen on, or 0 for any free port
+        :returns: tuple of the address and the port listened on
+        """
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self._workers)
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        """
+        Stop accepting connections and shut down the rendering processes.
+        """
+        self._server.close()
+        await self._server.wait_closed()
+        self._executor.shutdown()
+
+    async def _handle(self, reader, writer):
+        """
+        Respond to a single request and close the connection.
+        """
+        request_line = await reader.readline()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        status, content_type, body = await self._respond(request_line)
+        writer.write("HTTP/1.1 {}\r\nContent-Type: {}\r\nContent-Length: {}"
+                     "\r\nConnection: close\r\n\r\n".format(
+                         status, content_type, len(body)).encode())
+        writer.write(body)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _respond(self, request_line):
+        # pylint: disable=too-many-return-statements
+        """
+        Return the status line, content type and body of the response.
+        """
+        try:
+            method, target, _ = request_line.decode("ascii").split()
+        except (UnicodeDecodeError, ValueError):
+            return _error("400 Bad Request", "Malformed request")
+        if method != "GET":
+            return _error("405 Method Not Allowed", "Only GET is supported")
+        url = urllib.parse.urlsplit(target)
+        query = {name: values[-1] for name, values
+                 in urllib.parse.parse_qs(url.query).items()}
+        parts = url.path.strip("/").split("/")
+        try:
+            if len(parts) == 2 and parts[0] == "day" \
+                    and parts[1].endswith(".png"):
+                return await self._day(_date(parts[1][:-len(".png")]))
+            if len(parts) == 3 and parts[0] == "range" \
+                    and parts[2].endswith(".png"):
+                return await self._range(_date(parts[1]),
+                                         _date(parts[2][:-len(".png")]),
+                                         query)
+            if parts in (["aggregate.json"], ["aggregate.csv"]):
+                return await self._aggregate(parts[0].rpartition(".")[2],
+                                             query)
+        except DataNotFound as err:
+            return _error("404 Not Found", str(err))
+        except ParseError as err:
+            return _error("500 Internal Server Error", str(err))
+        except ValueError as err:
+            return _error("400 Bad Request", str(err))
+        return _error("404 Not Found", "Unknown path {}".format(url.path))
+
+    async def _day(self, date):
+        """
+        Return the day graph of a day.
+        """
+        signature = await self._signature(date, date)
+        return await self._image(("day", date), signature, date, date,
+                                 lambda data: ("day", date, data))
+
+    async def _range(self, start, end, query):
+        """
+        Return the range graph of a range of days.
+        """
+        decimation = query.get("decimation", "minmax")
+        if decimation == "none":
+            decimation = None
+        elif decimation not in METHODS:
+            raise ValueError("Unknown decimation {!r}".format(decimation))
+        signature = await self._signature(start, end)
+        return await self._image(
+            ("range", start, end, decimation), signature, start, end,
+            lambda data: ("range", start, end, data, decimation))
+
+    async def _aggregate(self, output_format, query):
+        """
+        Return aggregated data as JSON or CSV.
+        """
+        try:
+            start, end = _date(query["start"]), _date(query["end"])
+        except KeyError as err:
+            raise ValueError("Parameters start and end are required") from err
+        bucket = query.get("bucket", "day")
+        if bucket.isdigit():
+            bucket = int(bucket)
+        how = query.get("how", "sum")
+        values = query.get("values", "kwhs")
+        data = await self._data(start, end, await self._signature(start, end))
+        result = await self._in_thread(data.resample, bucket, how, values)
+        if output_format == "json":
+            body = json.dumps({
+                "starts": np.datetime_as_string(result.starts,
+                                                unit="m").tolist(),
+                "values": result.values.tolist()})
+            return "200 OK", "application/json", body.encode()
+        output = io.StringIO()
+        write_csv([result], output, header=("start", values))
+        return "200 OK", "text/csv", output.getvalue().encode()
+
+    async def _image(self, graph, signature, start, end, task):
+        # pylint: disable=too-many-arguments
+        """
+        Return a rendered graph from the cache, or render it.
+
+        :graph: tuple identifying the graph
+        :signature: signature of the data files of the graph
+        :start: first day of the data of the graph
+        :end: last day of the data of the graph
+        :task: function returning the render_png task for the data
+        """
+        key = (graph, signature)
+        image = self.images.get(key)
+        if image is None:
+            data = await self._data(start, end, signature)
+            image = await asyncio.get_event_loop().run_in_executor(
+                self._executor, render_png, task(data))
+            self.images.put(key, image)
+        return "200 OK", "image/png", image
+
+    async def _data(self, start, end, signature):
+        """
+        Return the data of a range of days from the cache, or read it.
+        """
+        key = (start, end, signature)
+        data = self.datasets.get(key)
+        if data is None:
+            data = await self._in_thread(self._reader.read_range, start, end,
+                                         skip_missing=True)
+            self.datasets.put(key, data)
+        return data
+
+    async def _signature(self, start, end):
+        """
+        Return the paths, sizes and modification times of the data files of
+        a range of days.
+
+        Raises DataNotFound if there are no data files in the range.
+        """
+        files = await self._in_thread(self._reader.data_files, start, end)
+        if not files:
+            raise DataNotFound("Data not found for dates {} - {}".format(
+                start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")))
+        return tuple(_file_signature(path) for _, path in files)
+
+    async def _in_thread(self, function, *args, **kwargs):
+        return await asyncio.get_event_loop().run_in_executor(
+            None, functools.partial(function, *args, **kwargs))
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return (path, stat.st_size, stat.st_mtime_ns)
+
+
+def _date(value):
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError as err:
+        raise ValueError("Invalid date {!r}: use YYYY-mm-dd".format(
+            value)) from err
+
+
+def _error(status, message):
+    return status, "text/plain; charset=utf-8", (message + "\n").encode()
+
+
+def main(args=None):
+    """
+    Serve plots and aggregates of the data files in a directory over HTTP.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("datadir", help="location of the data files")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address to listen on")
+    parser.add_argument("--port", type=int, default=8080,
+                        help="port to listen on")
+    parser.add_argument("--cache-dir", help="location for cached data")
+    parser.add_argument("--workers", type=int,
+                        help="number of rendering processes")
+    args = parser.parse_args(args)
+    server = PlotServer(args.datadir, cache_dir=args.cache_dir,
+                        workers=args.workers)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    host, port = loop.run_until_complete(server.start(args.host, args.port))
+    print("Serving on http://{}:{}/".format(host, port))
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.run_until_complete(server.close())
+        loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Streaming processing of pulse count data.
+
+Instead of loading a whole time range into memory, the data can be processed
+as a stream of chunks in timestamp order. A stream is started with
+read_chunks, which reads one day at a time, and processed with stages: each
+stage is a generator function taking the chunks of the previous stage and
+yielding new chunks, so the stages can be chained directly or with
+pipeline. Only a chunk or two is held in memory at any time, regardless of
+the length of the processed history.
+
+Stages operate on two kinds of chunks: ColumnarDataSets as read from the
+data files, and Series (or Aggregates, which have the same layout) of
+timestamps and values, produced by to_series and aggregate_stream.
+
+For example, writing the daily consumption of a year into a CSV file:
+
+    pipeline(read_chunks(reader, start, end),
+             to_series,
+             functools.partial(aggregate_stream, bucket="day"),
+             functools.partial(write_csv, out=csv_file))
+"""
+
+import collections
+
+import numpy as np
+
+from energy_plotter.aggregate import Aggregate, aggregate
+from energy_plotter.dataset import ColumnarDataSet
+
+
+Series = collections.namedtuple("Series", ["timestamps", "values"])
+Series.__doc__ = """
+A chunk of values in timestamp order.
+
+:timestamps: datetime64[m] array
+:values: array of values corresponding to the timestamps
+"""
+
+
+def pipeline(source, *stages):
+    """
+    Chain processing stages to a stream.
+
+    :source: iterable of chunks
+    :stages: functions taking an iterable of chunks and returning an
+             iterable of chunks or, for the last stage, any result
+    :returns: the return value of the last stage
+    """
+    for stage in stages:
+        source = stage(source)
+    return source
+
+
+def read_chunks(reader, start=None, end=None):
+    """
+    Yield the data of each day with data, one day at a time.
+
+    :reader: PulseReader for the data files
+    :start: datetime representation of the first day, by default the first
+            day with data
+    :end: datetime representation of the last day, by default the last day
+          with data
+    :returns: generator of ColumnarDataSets
+    """
+    for day in reader.available_days(start, end):
+        yield reader.read_day(day)
+
+
+def rechunk(chunks, size):
+    """
+    Yield datasets of a fixed number of records.
+
+    :chunks: iterable of ColumnarDataSets
+    :size: number of records in each yielded dataset, the last one
+           possibly containing fewer
+    :returns: generator of ColumnarDataSets
+    """
+    pending = []
+    pending_length = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_length += len(chunk)
+        if pending_length < size:
+            continue
+        combined = ColumnarDataSet.concatenate(pending)
+        full_length = len(combined) - len(combined) % size
+        for offset in range(0, full_length, size):
+            yield combined[offset:offset + size]
+        pending = [combined[full_length:]]
+        pending_length = len(pending[0])
+    if pending_length:
+        yield ColumnarDataSet.concatenate(pending)
+
+
+def filter_range(chunks, start=None, end=None):
+    """
+    Yield only the data from start (inclusive) to end (exclusive).
+
+    Reading the stream stops at the first chunk past the end.
+
+    :chunks: iterable of ColumnarDataSets or Series
+    :start: datetime of the first included minute, or None
+    :end: datetime of the first excluded minute, or None
+    :returns: generator of chunks of the same type
+    """
+    start = None if start is None else np.datetime64(start, "m")
+    end = None if end is None else np.datetime64(end, "m")
+    for chunk in chunks:
+        timestamps = chunk.timestamps
+        if timestamps.size == 0:
+            continue
+        if end is not None and timestamps[0] >= end:
+            return
+        first = 0 if start is None else np.searchsorted(timestamps, start)
+        last = (len(timestamps) if end is None
+                else np.searchsorted(timestamps, end))
+        if first < last:
+            yield _slice(chunk, first, last)
+
+
+def to_series(chunks, values="kwhs"):
+    """
+    Convert datasets to Series of kWh or pulse values.
+
+    :chunks: iterable of ColumnarDataSets
+    :values: "kwhs" or "pulses"
+    :returns: generator of Series
+    """
+    if values not in ("kwhs", "pulses"):
+        raise ValueError("Unknown values {!r}: use 'kwhs' or 'pulses'"
+                         "".format(values))
+    for chunk in chunks:
+        yield Series(chunk.timestamps, getattr(chunk, values))
+
+
+def aggregate_stream(chunks, bucket, how="sum"):
+    """
+    Aggregate a stream into time buckets.
+
+    Buckets spanning several chunks (e.g. months of daily chunks) are
+    combined across the chunks, and each bucket is yielded once complete.
+
+    :chunks: iterable of Series, or of ColumnarDataSets to aggregate kWhs
+    :bucket: bucket size, see energy_plotter.aggregate.bucket_starts
+    :how: statistic computed for each bucket: "sum", "mean", "max", "min"
+          or "count"
+    :returns: generator of Aggregates
+    """
+    if how not in ("sum", "mean", "max", "min", "count"):
+        raise ValueError("Unknown aggregation {!r}".format(how))
+    pending = None
+    for chunk in chunks:
+        if isinstance(chunk, ColumnarDataSet):
+            chunk = Series(chunk.timestamps, chunk.kwhs)
+        if chunk.timestamps.size == 0:
+            continue
+        minutes = chunk.timestamps.astype(np.int64)
+        partial = {name: aggregate(minutes, chunk.values, bucket, name)
+                   for name in ("sum", "count", "min", "max")}
+        partial = Aggregate(partial["sum"].starts,
+                            {name: result.values
+                             for name, result in partial.items()})
+        if pending is not None:
+            if pending.starts[0] == partial.starts[0]:
+                partial = _merge_first(pending, partial)
+            else:
+                yield _finish(pending, how)
+        if len(partial.starts) > 1:
+            yield _finish(_slice_partial(partial, 0, -1), how)
+        pending = _slice_partial(partial, -1, None)
+    if pending is not None:
+        yield _finish(pending, how)
+
+
+def write_csv(chunks, out, header=("timestamp", "value")):
+    """
+    Write a stream of Series or Aggregates into a CSV file.
+
+    Timestamps are written in ISO 8601 format (YYYY-mm-ddTHH:MM).
+
+    :chunks: iterable of Series or Aggregates
+    :out: writable text file object
+    :header: column names for the header line, or None for no header
+    :returns: number of rows written
+    """
+    if header is not None:
+        out.write(",".join(header) + "\n")
+    rows = 0
+    for timestamps, values in chunks:
+        if timestamps.size == 0:
+            continue
+        lines = np.char.add(
+            np.char.add(np.datetime_as_string(timestamps, unit="m"), ","),
+            np.asarray(values).astype(str))
+        out.write("\n".join(lines.tolist()) + "\n")
+        rows += len(lines)
+    return rows
+
+
+def _slice(chunk, first, last):
+    if isinstance(chunk, ColumnarDataSet):
+        return chunk[first:last]
+    return type(chunk)(*(column[first:last] for column in chunk))
+
+
+def _slice_partial(partial, first, last):
+    """
+    Return a slice of the buckets of partially aggregated data.
+    """
+    return Aggregate(partial.starts[first:last],
+                     {name: values[first:last]
+                      for name, values in partial.values.items()})
+
+
+def _merge_first(pending, partial):
+    """
+    Combine a pending bucket with the first bucket of partial data.
+    """
+    values = {name: values.copy() for name, values in partial.values.items()}
+    pending = pending.values
+    values["sum"][0] += pending["sum"][0]
+    values["count"][0] += pending["count"][0]
+    values["min"][0] = min(values["min"][0], pending["min"][0])
+    values["max"][0] = max(values["max"][0], pending["max"][0])
+    return Aggregate(partial.starts, values)
+
+
+def _finish(partial, how):
+    """
+    Return an Aggregate with the requested statistic of partial data.
+    """
+    if how == "mean":
+        return Aggregate(partial.starts,
+                         partial.values["sum"] / partial.values["count"])
+    return Aggregate(partial.starts, partial.values[how])
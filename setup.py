@@ -20,6 +20,7 @@ setuptools.setup(
     python_requires='>=3.6',
     install_requires=[
         "matplotlib",
+        "numpy",
         "sortedcontainers",
         ],
 )
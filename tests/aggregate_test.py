@@ -0,0 +1,78 @@
+"""
+Tests for aggregating data into time buckets.
+"""
+
+import datetime
+
+import numpy as np
+import pytest
+
+import conf
+from energy_plotter.aggregate import aggregate, bucket_starts
+from energy_plotter.dataset import ColumnarDataSet, DataSet
+
+
+@pytest.fixture
+def dataset_fx():
+    """
+    Return a dataset with one point per 20 minutes from 2021-01-31 22:00 to
+    2021-02-01 01:40, pulse counts increasing from 0.
+    """
+    start = datetime.datetime(2021, 1, 31, 22, 0)
+    return ColumnarDataSet(
+        [start + datetime.timedelta(minutes=20 * i) for i in range(12)],
+        range(12))
+
+
+# pylint: disable=redefined-outer-name
+
+def test_hourly_aggregation(dataset_fx):
+    """
+    Test computing each statistic for hourly buckets.
+    """
+    result = dataset_fx.resample("hour", values="pulses")
+    assert result.starts.tolist() == [
+        datetime.datetime(2021, 1, 31, 22, 0),
+        datetime.datetime(2021, 1, 31, 23, 0),
+        datetime.datetime(2021, 2, 1, 0, 0),
+        datetime.datetime(2021, 2, 1, 1, 0)]
+    assert result.values.tolist() == [3, 12, 21, 30]
+    assert dataset_fx.resample("hour", "max", "pulses").values.tolist() == [
+        2, 5, 8, 11]
+    assert dataset_fx.resample("hour", "min", "pulses").values.tolist() == [
+        0, 3, 6, 9]
+    assert dataset_fx.resample("hour", "mean", "pulses").values.tolist() == [
+        1, 4, 7, 10]
+    assert dataset_fx.resample("hour", "count").values.tolist() == [3] * 4
+
+
+def test_calendar_aggregation(dataset_fx):
+    """
+    Test daily, weekly and monthly buckets and kWh conversion.
+    """
+    daily = dataset_fx.resample("day")
+    assert daily.starts.tolist() == [datetime.datetime(2021, 1, 31),
+                                     datetime.datetime(2021, 2, 1)]
+    assert np.allclose(daily.values,
+                       [15 * conf.KWH_PER_PULSE, 51 * conf.KWH_PER_PULSE])
+    assert dataset_fx.resample("month").starts.tolist() == [
+        datetime.datetime(2021, 1, 1), datetime.datetime(2021, 2, 1)]
+    weekly = dataset_fx.resample("week", values="pulses")
+    assert weekly.starts.tolist() == [datetime.datetime(2021, 1, 25),
+                                      datetime.datetime(2021, 2, 1)]
+    assert DataSet(dataset_fx).resample("day").values.tolist() == (
+        daily.values.tolist())
+
+
+def test_bucket_validation():
+    """
+    Ensure that unknown buckets and statistics are rejected.
+    """
+    assert bucket_starts([0, 7, 25], 10).tolist() == [0, 0, 20]
+    with pytest.raises(ValueError):
+        bucket_starts([0], 7)
+    with pytest.raises(ValueError):
+        bucket_starts([0], "year")
+    with pytest.raises(ValueError):
+        aggregate([0], [1], "hour", "median")
+    assert len(aggregate([], [], "hour").values) == 0
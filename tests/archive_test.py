@@ -0,0 +1,66 @@
+"""
+Tests for the consolidated data archive.
+"""
+
+import datetime
+
+import pytest
+
+from energy_plotter.archive import ArchiveReader, compact
+from energy_plotter.data_reader import DataNotFound, PulseReader
+
+
+def test_archive_matches_reader(datadir_fx, tmp_path):
+    """
+    Test that data read from an archive matches the data files.
+    """
+    reader = PulseReader(str(datadir_fx))
+    path = str(tmp_path / "archive.bin")
+    assert compact(reader, path) == 3
+
+    archive = ArchiveReader(path)
+    start = datetime.date(2021, 2, 3)
+    end = datetime.date(2021, 2, 5)
+    assert archive.first_day == start
+    data = archive.read_range(start, end)
+    expected = reader.read_range(start, end)
+    assert data.minutes.tolist() == expected.minutes.tolist()
+    assert data.pulses.tolist() == expected.pulses.tolist()
+    assert list(archive.read_day(datetime.date(2021, 2, 4))) == list(
+        reader.read_day(datetime.date(2021, 2, 4)))
+    assert len(archive.read_range(datetime.date(2021, 1, 1), start)) == 24 * 60
+
+
+def test_archive_gaps_and_updates(datadir_fx, tmp_path, write_day_fx):
+    """
+    Test appending to an archive over a gap and updating a day in place.
+    """
+    reader = PulseReader(str(datadir_fx))
+    path = str(tmp_path / "archive.bin")
+    compact(reader, path)
+    archive = ArchiveReader(path)
+
+    day = datetime.date(2021, 2, 8)
+    write_day_fx(datadir_fx, day, minutes=range(0, 100, 2))
+    compact(reader, path, start=day)
+    assert len(archive.read_day(day)) == 50
+    with pytest.raises(DataNotFound):
+        archive.read_day(datetime.date(2021, 2, 7))
+
+    write_day_fx(datadir_fx, day, minutes=range(100))
+    compact(reader, path, start=day)
+    assert len(archive.read_day(day)) == 100
+    assert len(archive.read_range(datetime.date(2021, 2, 3), day)) == (
+        3 * 24 * 60 + 100)
+
+
+def test_archive_before_start(datadir_fx, tmp_path, write_day_fx):
+    """
+    Ensure that data preceding the start of the archive is rejected.
+    """
+    reader = PulseReader(str(datadir_fx))
+    path = str(tmp_path / "archive.bin")
+    compact(reader, path)
+    write_day_fx(datadir_fx, datetime.date(2021, 2, 1))
+    with pytest.raises(ValueError):
+        compact(reader, path)
@@ -0,0 +1,49 @@
+"""
+Tests for the data caches.
+"""
+
+import datetime
+import os
+
+from energy_plotter.cache import DayCache
+from energy_plotter.data_reader import PulseReader
+
+
+def test_day_cache(datadir_fx, tmp_path):
+    """
+    Test that cached data is identical to parsed data and that a cached file
+    isn't parsed again.
+    """
+    path = str(datadir_fx / "2021-02-04.txt")
+    cache = DayCache(str(tmp_path / "cache"))
+    parsed = []
+
+    def parse(path):
+        parsed.append(path)
+        return PulseReader(str(datadir_fx)).read_day(
+            datetime.date(2021, 2, 4))
+
+    first = cache.read(path, parse)
+    second = cache.read(path, parse)
+    assert parsed == [path]
+    assert second.minutes.tolist() == first.minutes.tolist()
+    assert second.pulses.tolist() == first.pulses.tolist()
+
+
+def test_day_cache_invalidation(datadir_fx, tmp_path, write_day_fx):
+    """
+    Ensure that a data file that has changed is parsed again and the
+    outdated cache file is removed.
+    """
+    cache_dir = tmp_path / "cache"
+    reader = PulseReader(str(datadir_fx), cache_dir=str(cache_dir))
+    day = datetime.date(2021, 2, 4)
+    write_day_fx(datadir_fx, day, minutes=range(10))
+    assert len(reader.read_day(day)) == 10
+
+    write_day_fx(datadir_fx, day, minutes=range(20))
+    assert len(reader.read_day(day)) == 20
+    assert len(reader.read_range(day, day)) == 20
+    entries = [name for _, _, names in os.walk(str(cache_dir))
+               for name in names]
+    assert len(entries) == 1
@@ -0,0 +1,45 @@
+"""
+Shared fixtures for tests that need data files.
+"""
+
+import datetime
+
+import pytest
+
+
+@pytest.fixture
+def write_day_fx():
+    """
+    Return a function for writing a day of data into a data directory.
+
+    The function takes the directory, the date and optionally the minutes of
+    the day to include (all by default) and the file extension, and writes a
+    data file in which the pulse count of each minute is its minute of day
+    modulo 100 plus the day of month.
+    """
+    def write_day(directory, day, minutes=None, extension="txt"):
+        if minutes is None:
+            minutes = range(24 * 60)
+        start = datetime.datetime(day.year, day.month, day.day)
+        lines = ["{}\t{}\n".format(
+            (start + datetime.timedelta(minutes=minute)).strftime(
+                "%Y-%m-%d-%H:%M"), minute % 100 + day.day)
+                 for minute in minutes]
+        path = directory / "{}.{}".format(day.strftime("%Y-%m-%d"),
+                                          extension)
+        path.write_text("".join(lines))
+        return path
+    return write_day
+
+
+# pylint: disable=redefined-outer-name
+
+@pytest.fixture
+def datadir_fx(tmp_path, write_day_fx):
+    """
+    Return a data directory with full days of data for 2021-02-03 to
+    2021-02-05.
+    """
+    for day in range(3, 6):
+        write_day_fx(tmp_path, datetime.date(2021, 2, day))
+    return tmp_path
@@ -8,6 +8,7 @@ import pytest
 
 from energy_plotter.data_reader import PulseReader, DataNotFound
 from energy_plotter.datapoint import DataPoint
+from energy_plotter.parser import ParseError
 
 
 @pytest.fixture()
@@ -68,3 +69,116 @@ def test_read_ambiguous_file(reader_fx):
     with pytest.raises(ValueError) as err:
         reader_fx.read_day(datetime.date(2020, 2, 5))
     assert "More than one data file found for date" in str(err.value)
+
+
+def test_read_day_invalid_lines(tmp_path):
+    """
+    Test that invalid lines in a data file are reported with line numbers.
+    """
+    (tmp_path / "2021-02-04.txt").write_text("2021-02-04-00:00 10\n"
+                                             "2021-02-04-00:01 x\n")
+    with pytest.raises(ParseError) as err:
+        PulseReader(str(tmp_path)).read_day(datetime.date(2021, 2, 4))
+    assert err.value.errors[0][0] == 2
+
+
+@pytest.mark.parametrize("workers, processes", [(1, False), (None, False),
+                                                (2, True)])
+def test_read_range(datadir_fx, workers, processes):
+    """
+    Test that read_range returns the data of all days in order.
+    """
+    reader = PulseReader(str(datadir_fx))
+    data = reader.read_range(datetime.date(2021, 2, 3),
+                             datetime.date(2021, 2, 5),
+                             workers=workers, processes=processes)
+    assert len(data) == 3 * 24 * 60
+    assert data[0].timestamp == datetime.datetime(2021, 2, 3, 0, 0)
+    assert data[-1].timestamp == datetime.datetime(2021, 2, 5, 23, 59)
+    assert list(data[:24 * 60]) == list(
+        reader.read_day(datetime.date(2021, 2, 3)))
+
+
+def test_read_range_missing_days(datadir_fx):
+    """
+    Test that all missing days are reported and can be skipped.
+    """
+    reader = PulseReader(str(datadir_fx))
+    start = datetime.date(2021, 2, 2)
+    end = datetime.date(2021, 2, 6)
+    assert reader.missing_days(start, end) == [datetime.date(2021, 2, 2),
+                                               datetime.date(2021, 2, 6)]
+    with pytest.raises(DataNotFound) as err:
+        reader.read_range(start, end)
+    assert "2021-02-02, 2021-02-06" in str(err.value)
+    assert len(reader.read_range(start, end, skip_missing=True)) == 3 * 24 * 60
+
+
+def test_available_days(datadir_fx):
+    """
+    Test listing the days with data within a range.
+    """
+    reader = PulseReader(str(datadir_fx))
+    assert reader.available_days() == [datetime.date(2021, 2, day)
+                                       for day in (3, 4, 5)]
+    assert reader.available_days(start=datetime.date(2021, 2, 4),
+                                 end=datetime.date(2021, 2, 4)) == [
+                                     datetime.date(2021, 2, 4)]
+
+
+def _append_lines(path, text):
+    with open(str(path), "a") as data_file:
+        data_file.write(text)
+
+
+def test_follow_day(tmp_path, write_day_fx):
+    """
+    Test that a follower picks up appended lines, waiting for partially
+    written lines to be completed.
+    """
+    day = datetime.date(2021, 2, 4)
+    path = write_day_fx(tmp_path, day, minutes=range(10))
+    follower = PulseReader(str(tmp_path)).follow(day)
+    first = follower.refresh()
+    assert len(first) == 10
+
+    _append_lines(path, "2021-02-04-00:10\t5\n2021-02-04-00:1")
+    assert len(follower.refresh()) == 11
+    _append_lines(path, "1\t7\n")
+    data = follower.refresh()
+    assert data.pulses.tolist()[-2:] == [5, 7]
+    assert len(first) == 10
+
+    _append_lines(path, "2021-02-04-00:05\t99\n2021-02-04-00:12 x\n")
+    with pytest.raises(ParseError) as err:
+        follower.refresh()
+    assert err.value.errors[0][0] == 14
+
+
+def test_follow_day_out_of_order_and_truncation(tmp_path, write_day_fx):
+    """
+    Test that out of order lines are merged and that a rewritten file is
+    read again from the beginning.
+    """
+    day = datetime.date(2021, 2, 4)
+    path = write_day_fx(tmp_path, day, minutes=range(5, 10))
+    follower = PulseReader(str(tmp_path)).follow(day)
+    first = follower.refresh()
+    _append_lines(path, "2021-02-04-00:00\t1\n2021-02-04-00:05\t1\n")
+    data = follower.refresh()
+    start = first.minutes[0] - 5
+    assert data.minutes.tolist() == [start + i for i in (0, 5, 6, 7, 8, 9)]
+    assert data[0].pulses == 1
+    assert data[1].pulses == first[0].pulses
+    assert len(data) == 6
+
+    write_day_fx(tmp_path, day, minutes=range(3))
+    assert len(follower.refresh()) == 3
+
+
+def test_follow_missing_day(tmp_path):
+    """
+    Ensure that following a day without a data file yet gives no data.
+    """
+    follower = PulseReader(str(tmp_path)).follow(datetime.date(2021, 2, 4))
+    assert len(follower.refresh()) == 0
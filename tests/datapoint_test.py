@@ -227,3 +227,37 @@ def test_datapoint_kwh_pulses_not_set():
     datapoint = DataPoint()
     with pytest.raises(NoValueForAttribute):
         datapoint.kwh  # pylint: disable=pointless-statement
+
+
+def test_datapoint_slots():
+    """
+    Ensure that DataPoints don't have an instance dictionary.
+    """
+    datapoint = DataPoint(pulses=1)
+    with pytest.raises(AttributeError):
+        datapoint.extra = 1
+
+
+def test_datapoint_from_validated():
+    """
+    Test creating a data point from validated values.
+    """
+    timestamp = datetime.datetime(2020, 11, 28, 18, 45)
+    datapoint = DataPoint.from_validated(timestamp, 7)
+    assert datapoint == DataPoint(timestamp=timestamp, pulses=7)
+    assert datapoint.pulses == 7
+    with pytest.raises(ImmutableMutationError):
+        datapoint.timestamp = timestamp
+
+
+def test_datapoint_minute():
+    """
+    Test the minute index of data points.
+    """
+    assert DataPoint(timestamp="1970-01-02-00:01").minute == 24 * 60 + 1
+    aware = datetime.datetime(1970, 1, 1, 2, 0,
+                              tzinfo=datetime.timezone(
+                                  datetime.timedelta(hours=2)))
+    assert DataPoint(timestamp=aware).minute == 0
+    with pytest.raises(NoValueForAttribute):
+        DataPoint().minute  # pylint: disable=pointless-statement
@@ -4,11 +4,12 @@ Tests for DataSet
 
 import datetime
 
+import numpy as np
 import pytest
 
 import conf
-from energy_plotter.datapoint import DataPoint
-from energy_plotter.dataset import DataSet
+from energy_plotter.datapoint import DataPoint, NoValueForAttribute
+from energy_plotter.dataset import ColumnarDataSet, DataSet
 
 
 @pytest.fixture
@@ -123,3 +124,108 @@ def test_dataset_kwhs(datapoints_fx, pulses_fx):
     assert dset.kwhs == []
     dset.update(datapoints_fx)
     assert dset.kwhs == [p * conf.KWH_PER_PULSE for p in pulses_fx]
+
+
+def test_columnar_empty():
+    """
+    Test that an empty columnar dataset has no data.
+    """
+    dset = ColumnarDataSet()
+    assert len(dset) == 0
+    assert list(dset) == []
+    assert len(dset.kwhs) == 0
+
+
+def test_columnar_ordering(datapoints_fx):
+    """
+    Check that columnar data is ordered and deduplicated by timestamp.
+
+    Out of duplicate timestamps the first one must be kept, as in DataSet.
+    """
+    input_order = [2, 4, 1, 0, 3]
+    timestamps = [datapoints_fx[i].timestamp for i in input_order]
+    pulses = [datapoints_fx[i].pulses for i in input_order]
+    dset = ColumnarDataSet(timestamps + [timestamps[0]], pulses + [1])
+    assert list(dset) == datapoints_fx
+    assert dset[2].pulses == datapoints_fx[2].pulses
+
+
+def test_columnar_properties(datapoints_fx, timestamps_fx, pulses_fx):
+    """
+    Test the timestamps, pulses and kwhs properties of columnar data.
+    """
+    dset = ColumnarDataSet.from_datapoints(DataSet(datapoints_fx))
+    assert dset.timestamps.tolist() == timestamps_fx
+    assert dset.pulses.tolist() == pulses_fx
+    assert np.allclose(dset.kwhs,
+                       [p * conf.KWH_PER_PULSE for p in pulses_fx])
+    with pytest.raises(ValueError):
+        dset.pulses[0] = 1
+
+
+def test_columnar_index(datapoints_fx, timestamps_fx):
+    """
+    Test locating data points and datetimes in columnar data.
+    """
+    dset = ColumnarDataSet.from_datapoints(datapoints_fx)
+    assert dset.index(datapoints_fx[3]) == 3
+    assert dset.index(timestamps_fx[1]) == 1
+    assert timestamps_fx[4] in dset
+    with pytest.raises(ValueError):
+        dset.index(datetime.datetime(2019, 1, 1))
+
+
+def test_columnar_negative_pulses(timestamps_fx):
+    """
+    Ensure that negative pulse counts are rejected.
+    """
+    with pytest.raises(ValueError):
+        ColumnarDataSet(timestamps_fx[:2], [1, -1])
+
+
+def test_columnar_concatenate(datapoints_fx):
+    """
+    Test combining columnar datasets, including overlapping ones.
+    """
+    first = ColumnarDataSet.from_datapoints(datapoints_fx[:3])
+    second = ColumnarDataSet.from_datapoints(datapoints_fx[2:])
+    combined = ColumnarDataSet.concatenate([second, first])
+    assert list(combined) == datapoints_fx
+    assert list(combined[1:3]) == datapoints_fx[1:3]
+
+
+def test_dataset_minute_key(datapoints_fx):
+    """
+    Test that the dataset is keyed on minute indices and that set operations
+    and equality still work on timestamps.
+    """
+    dset = DataSet(datapoints_fx[:3])
+    other = DataSet(datapoints_fx[2:])
+    assert list(dset | other) == datapoints_fx
+    assert list(dset & other) == [datapoints_fx[2]]
+    assert DataPoint(timestamp=datapoints_fx[1].timestamp) in dset
+    assert dset.index(DataPoint(timestamp=datapoints_fx[2].timestamp)) == 2
+    assert [dp.minute for dp in dset] == sorted(dp.minute for dp in dset)
+
+
+def test_add_without_timestamp():
+    """
+    Ensure that DataPoints without timestamps cannot be added.
+    """
+    with pytest.raises(NoValueForAttribute):
+        DataSet().add(DataPoint(pulses=1))
+
+
+def test_columnar_kwh_per_pulse():
+    """
+    Test datasets with a meter specific kWh per pulse constant.
+    """
+    start = datetime.datetime(2021, 2, 4)
+    dset = ColumnarDataSet([start, start + datetime.timedelta(minutes=1)],
+                           [10, 20], kwh_per_pulse=0.001)
+    assert np.allclose(dset.kwhs, [0.01, 0.02])
+    assert np.allclose(dset[1:].kwhs, [0.02])
+    assert np.allclose(dset.resample("hour").values, [0.03])
+    assert np.allclose(dset.with_kwh_per_pulse(0.1).kwhs, [1, 2])
+    with pytest.raises(ValueError):
+        ColumnarDataSet.concatenate([dset, ColumnarDataSet([start], [1])])
@@ -0,0 +1,73 @@
+"""
+Tests for decimating series for plotting.
+"""
+
+import numpy as np
+import pytest
+
+from energy_plotter.dataset import ColumnarDataSet
+from energy_plotter.decimate import (decimate_indices, lttb_indices,
+                                     minmax_indices)
+
+
+@pytest.fixture
+def series_fx():
+    """
+    Return a noisy series of 10000 points with a single high peak.
+    """
+    rng = np.random.RandomState(0)
+    x = np.arange(10000)
+    y = rng.uniform(0, 1, 10000)
+    y[6543] = 10
+    return x, y
+
+
+# pylint: disable=redefined-outer-name
+
+def test_lttb(series_fx):
+    """
+    Test that LTTB keeps the requested number of points including the ends
+    and the peak.
+    """
+    x, y = series_fx
+    indices = lttb_indices(x, y, 500)
+    assert len(indices) == 500
+    assert indices[0] == 0 and indices[-1] == 9999
+    assert (np.diff(indices) > 0).all()
+    assert 6543 in indices
+
+
+def test_minmax(series_fx):
+    """
+    Test that min-max decimation keeps the extremes of every column.
+    """
+    x, y = series_fx
+    indices = minmax_indices(x, y, 100)
+    assert len(indices) <= 200
+    assert (np.diff(indices) > 0).all()
+    assert 6543 in indices
+    assert np.argmin(y) in indices
+    assert y[indices].max() == y.max()
+
+
+def test_short_series_untouched(series_fx):
+    """
+    Ensure that series shorter than the target are returned as is.
+    """
+    x, y = series_fx
+    assert len(decimate_indices(x[:50], y[:50], 100)) == 50
+    assert len(decimate_indices(x[:50], y[:50], 100, "minmax")) == 50
+    with pytest.raises(ValueError):
+        decimate_indices(x, y, 100, "every_nth")
+
+
+def test_dataset_decimate(series_fx):
+    """
+    Test decimating a dataset.
+    """
+    x, y = series_fx
+    dset = ColumnarDataSet(x.astype("datetime64[m]"),
+                           (y * 100).astype(int))
+    decimated = dset.decimate(300, "minmax")
+    assert len(decimated) <= 600
+    assert decimated.pulses.max() == dset.pulses.max()
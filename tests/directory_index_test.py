@@ -0,0 +1,44 @@
+"""
+Tests for DirectoryIndex class.
+"""
+
+import datetime
+import os
+
+from energy_plotter.directory_index import DirectoryIndex
+
+
+def test_index_files(datadir_fx):
+    """
+    Test looking up data files and listing the days with data.
+    """
+    (datadir_fx / "2021-02-05.csv").write_text("")
+    (datadir_fx / "notes.txt").write_text("")
+    (datadir_fx / "2021-2-6.txt").write_text("")
+    index = DirectoryIndex(str(datadir_fx))
+    assert index.days() == [datetime.date(2021, 2, day) for day in (3, 4, 5)]
+    assert index.files(datetime.date(2021, 2, 3)) == [
+        os.path.join(str(datadir_fx), "2021-02-03.txt")]
+    assert len(index.files(datetime.datetime(2021, 2, 5, 12, 0))) == 2
+    assert index.files(datetime.date(2021, 2, 6)) == []
+
+
+def test_index_refresh(datadir_fx, write_day_fx, monkeypatch):
+    """
+    Ensure that the directory is scanned again only when it has changed.
+    """
+    index = DirectoryIndex(str(datadir_fx))
+    past = datetime.datetime(2021, 2, 6).timestamp()
+    os.utime(str(datadir_fx), (past, past))
+    scans = []
+    original_scan = index._scan  # pylint: disable=protected-access
+    monkeypatch.setattr(index, "_scan",
+                        lambda: scans.append(1) or original_scan())
+
+    index.days()
+    index.days()
+    assert len(scans) == 1
+
+    write_day_fx(datadir_fx, datetime.date(2021, 2, 6))
+    assert datetime.date(2021, 2, 6) in index.days()
+    assert len(scans) == 2
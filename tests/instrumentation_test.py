@@ -0,0 +1,102 @@
+"""
+Tests for the opt-in instrumentation.
+"""
+
+import datetime
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from energy_plotter import instrumentation
+from energy_plotter.data_reader import PulseReader
+from energy_plotter.dataset import DataSet
+from energy_plotter.plot import Plot
+
+
+@pytest.fixture
+def instrumentation_fx():
+    """
+    Enable instrumentation for a test, starting from no recorded values.
+    """
+    instrumentation.reset()
+    instrumentation.enable()
+    yield instrumentation
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+# pylint: disable=redefined-outer-name
+
+def test_disabled_records_nothing(datadir_fx):
+    """
+    Test that nothing is recorded by default.
+    """
+    instrumentation.reset()
+    PulseReader(datadir_fx).read_day(datetime.date(2021, 2, 4))
+    assert instrumentation.summary() == {"timers": {}, "counters": {}}
+
+
+def test_reading_stages(datadir_fx, tmp_path_factory, instrumentation_fx):
+    """
+    Test the counters and timers recorded when reading data.
+    """
+    cache_dir = str(tmp_path_factory.mktemp("cache"))
+    reader = PulseReader(datadir_fx, cache_dir=cache_dir)
+    data = reader.read_range(datetime.date(2021, 2, 3),
+                             datetime.date(2021, 2, 5), workers=1)
+    reader.read_day(datetime.date(2021, 2, 4))
+    DataSet(data[:10]).add(data[20])
+
+    summary = instrumentation_fx.summary()
+    counters = summary["counters"]
+    assert counters["files.opened"] == 3
+    assert counters["bytes.read"] == sum(
+        os.path.getsize(str(path)) for path in datadir_fx.iterdir()
+        if path.is_file())
+    assert counters["lines.parsed"] == 3 * 1440
+    assert counters["lines.slow_path"] == 0
+    assert counters["cache.misses"] == 3
+    assert counters["cache.hits"] == 1
+    assert counters["points.inserted"] == 11
+    for stage in ("index.scan", "read", "parse"):
+        assert summary["timers"][stage]["seconds"] > 0
+    assert summary["timers"]["parse"]["calls"] == 3
+
+    out = io.StringIO()
+    instrumentation_fx.dump(out)
+    assert json.loads(out.getvalue()) == summary
+
+
+def test_plot_stages(datadir_fx, tmp_path_factory, instrumentation_fx):
+    """
+    Test the timers recorded when rendering a plot.
+    """
+    outfile = str(tmp_path_factory.mktemp("plots") / "day.png")
+    Plot(datadir_fx).day_graph(datetime.date(2021, 2, 4), outfile)
+    summary = instrumentation_fx.summary()
+    assert summary["counters"]["plots.rendered"] == 1
+    assert summary["timers"]["plot.render"]["calls"] == 1
+    assert summary["timers"]["plot.save"]["seconds"] > 0
+
+
+def test_environment_variable(datadir_fx, tmp_path_factory):
+    """
+    Test enabling instrumentation with the environment variable, writing the
+    summary to a file at exit.
+    """
+    summary_file = tmp_path_factory.mktemp("summary") / "summary.json"
+    env = dict(os.environ)
+    env[instrumentation.ENVIRONMENT_VARIABLE] = str(summary_file)
+    subprocess.run(
+        [sys.executable, "-c",
+         "import datetime; from energy_plotter import PulseReader; "
+         "PulseReader({!r}).read_day(datetime.date(2021, 2, 4))".format(
+             str(datadir_fx))],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env, check=True)
+    summary = json.loads(summary_file.read_text())
+    assert summary["counters"]["files.opened"] == 1
@@ -0,0 +1,84 @@
+"""
+Tests for reading the data of several meters.
+"""
+
+import datetime
+
+import numpy as np
+import pytest
+
+from energy_plotter.data_reader import DataNotFound
+from energy_plotter.meters import Meter, MultiMeterReader
+
+
+DAY = datetime.date(2021, 2, 4)
+
+
+@pytest.fixture
+def reader_fx(tmp_path, write_day_fx):
+    """
+    Return a reader for two meters: a main meter with a full day of data and
+    a heat pump meter with the first hour of it, every other minute.
+    """
+    main_dir = tmp_path / "main"
+    heat_pump_dir = tmp_path / "heat_pump"
+    main_dir.mkdir()
+    heat_pump_dir.mkdir()
+    write_day_fx(main_dir, DAY)
+    write_day_fx(heat_pump_dir, DAY, minutes=range(0, 60, 2))
+    return MultiMeterReader([Meter("main", str(main_dir), 0.0001),
+                             Meter("heat pump", str(heat_pump_dir), 0.001)])
+
+
+# pylint: disable=redefined-outer-name
+
+def test_aligned_meters(reader_fx):
+    """
+    Test that the meters are aligned on a shared grid with their constants.
+    """
+    data = reader_fx.read_day(DAY)
+    assert data.names == ["main", "heat pump"]
+    assert len(data) == 1440
+    assert data.kwhs.shape == (2, 1440)
+    # Pulse count of the first minute is the day of month
+    assert data.meter_kwhs("main")[0] == pytest.approx(4 * 0.0001)
+    assert data.meter_kwhs("heat pump")[0] == pytest.approx(4 * 0.001)
+    assert np.isnan(data.meter_kwhs("heat pump")[1])
+    assert data.total_kwhs[0] == pytest.approx(4 * 0.0011)
+    assert data.total_kwhs[1] == pytest.approx(5 * 0.0001)
+    assert len(data.meter("heat pump")) == 30
+
+
+def test_resample_meters(reader_fx):
+    """
+    Test aggregating the total and a single meter.
+    """
+    data = reader_fx.read_day(DAY)
+    total = data.resample("day")
+    main = data.resample("day", meter="main")
+    heat_pump = data.resample("day", meter="heat pump")
+    assert total.values[0] == pytest.approx(main.values[0]
+                                            + heat_pump.values[0])
+    assert heat_pump.values[0] == pytest.approx(
+        sum(minute + 4 for minute in range(0, 60, 2)) * 0.001)
+    assert data.resample("hour", "count").values[0] == 60
+
+
+def test_missing_meter_day(reader_fx):
+    """
+    Test that a day missing from one meter is reported unless skipped.
+    """
+    with pytest.raises(DataNotFound):
+        reader_fx.read_range(DAY, DAY + datetime.timedelta(days=1))
+    data = reader_fx.read_range(DAY, DAY + datetime.timedelta(days=1),
+                                skip_missing=True)
+    assert len(data) == 1440
+
+
+def test_duplicate_meter_names(tmp_path):
+    """
+    Test that meters must have distinct names.
+    """
+    with pytest.raises(ValueError):
+        MultiMeterReader([Meter("main", str(tmp_path), 0.001),
+                          Meter("main", str(tmp_path), 0.001)])
@@ -0,0 +1,19 @@
+"""
+Tests for the package level API.
+"""
+
+import subprocess
+import sys
+
+
+def test_import_does_not_load_matplotlib():
+    """
+    Ensure that importing the package, including the plotting module, does
+    not import matplotlib.
+    """
+    code = ("import sys, energy_plotter, energy_plotter.plot; "
+            "print(any(name.split('.')[0] == 'matplotlib' "
+            "for name in sys.modules))")
+    output = subprocess.check_output([sys.executable, "-c", code],
+                                     universal_newlines=True)
+    assert output.strip() == "False"
@@ -0,0 +1,69 @@
+"""
+Tests for the bulk data file parser.
+"""
+
+import datetime
+
+import pytest
+
+from energy_plotter.datapoint import DataPoint
+from energy_plotter.parser import parse_pulse_data, ParseError
+
+
+@pytest.fixture
+def lines_fx():
+    """
+    Return lines of a data file spanning a day and a month boundary.
+    """
+    start = datetime.datetime(2020, 2, 28, 23, 58)
+    return ["{}\t{}".format(
+        (start + datetime.timedelta(days=i, minutes=i)).strftime(
+            "%Y-%m-%d-%H:%M"), i * 997)
+            for i in range(5)]
+
+
+# pylint: disable=redefined-outer-name
+
+def test_parse_matches_from_string(lines_fx):
+    """
+    Ensure that bulk parsing gives the same data as DataPoint.from_string.
+    """
+    data = parse_pulse_data("\n".join(lines_fx) + "\n")
+    expected = [DataPoint.from_string(line) for line in lines_fx]
+    assert list(data) == expected
+    assert data.pulses.tolist() == [dp.pulses for dp in expected]
+
+
+def test_parse_bytes_and_lenient_lines():
+    """
+    Test that bytes are accepted and that lines not in the fixed-width layout
+    are parsed like DataPoint.from_string parses them.
+    """
+    data = parse_pulse_data(b"2021-01-30-23:43   1558\r\n"
+                            b"  2021-01-30-23:44 12 \n"
+                            b"2021-1-30-23:45\t0")
+    assert data.pulses.tolist() == [1558, 12, 0]
+    assert data.timestamps[-1] == datetime.datetime(2021, 1, 30, 23, 45)
+
+
+def test_parse_empty():
+    """
+    Test that empty input results in an empty dataset.
+    """
+    assert len(parse_pulse_data(b"")) == 0
+
+
+def test_parse_errors_reported_together():
+    """
+    Check that all invalid lines are reported in one error with line numbers.
+    """
+    with pytest.raises(ParseError) as err:
+        parse_pulse_data("2021-01-30-23:43 1\n"
+                         "2021-01-30-23:44 -5\n"
+                         "2021-01-30-23:45\n"
+                         "2021-02-30-23:46 1\n", source="test.txt")
+    assert [line for line, _ in err.value.errors] == [2, 3, 4]
+    assert "negative" in err.value.errors[0][1]
+    assert "isn't a valid data entry" in err.value.errors[1][1]
+    assert "3 invalid lines in test.txt" in str(err.value)
+    assert isinstance(err.value, ValueError)
@@ -0,0 +1,39 @@
+"""
+Tests for Plot class.
+"""
+
+import datetime
+
+import pytest
+
+from energy_plotter.data_reader import DataNotFound
+from energy_plotter.plot import Plot
+
+
+def test_day_graph(datadir_fx, tmp_path_factory):
+    """
+    Test that day graphs are written, also when reusing the figure.
+    """
+    tmp_path = tmp_path_factory.mktemp("plots")
+    plot = Plot(str(datadir_fx))
+    for day in (3, 4):
+        outfile = tmp_path / "{}.png".format(day)
+        plot.day_graph(datetime.date(2021, 2, day), str(outfile))
+        assert outfile.stat().st_size > 0
+
+
+def test_batch_day_graphs(datadir_fx, tmp_path_factory):
+    """
+    Test rendering day graphs in worker processes.
+    """
+    tmp_path = tmp_path_factory.mktemp("plots")
+    plot = Plot(str(datadir_fx))
+    dates = [datetime.date(2021, 2, day) for day in range(2, 6)]
+    with pytest.raises(DataNotFound):
+        plot.batch_day_graphs(dates, str(tmp_path), workers=2)
+
+    written = plot.batch_day_graphs(dates, str(tmp_path), workers=2,
+                                    skip_missing=True)
+    assert written == [str(tmp_path / "2021-02-0{}.png".format(day))
+                       for day in range(3, 6)]
+    assert all((tmp_path / path).stat().st_size > 0 for path in written)
@@ -0,0 +1,61 @@
+"""
+Tests for the precomputed rollup store.
+"""
+
+import datetime
+
+import numpy as np
+import pytest
+
+from energy_plotter.data_reader import PulseReader
+from energy_plotter.rollup import RollupStore
+
+
+@pytest.mark.parametrize("bucket", ["hour", "day", "month", "15min", 120])
+@pytest.mark.parametrize("how", ["sum", "mean", "max", "min", "count"])
+def test_rollup_matches_minute_data(datadir_fx, tmp_path, bucket, how):
+    """
+    Test that aggregates computed from rollups match the minute data.
+    """
+    reader = PulseReader(str(datadir_fx))
+    store = RollupStore(reader, str(tmp_path / "rollups"))
+    store.update()
+    start = datetime.date(2021, 2, 4)
+    end = datetime.date(2021, 2, 5)
+    result = store.query(start, end, bucket, how)
+    expected = reader.read_range(start, end).resample(bucket, how)
+    assert result.starts.tolist() == expected.starts.tolist()
+    assert np.allclose(result.values, expected.values)
+
+
+def test_rollup_resolution():
+    """
+    Test choosing the coarsest rollup for a bucket size.
+    """
+    assert RollupStore.resolution_for("month") == "day"
+    assert RollupStore.resolution_for("hour") == "hour"
+    assert RollupStore.resolution_for(360) == "hour"
+    assert RollupStore.resolution_for("15min") is None
+
+
+def test_rollup_incremental_update(datadir_fx, tmp_path, write_day_fx):
+    """
+    Test that only added, changed and removed days are updated, also across
+    store instances.
+    """
+    reader = PulseReader(str(datadir_fx))
+    path = str(tmp_path / "rollups")
+    assert len(RollupStore(reader, path).update()) == 3
+
+    store = RollupStore(reader, path)
+    assert store.update() == []
+    write_day_fx(datadir_fx, datetime.date(2021, 2, 4), minutes=range(60))
+    write_day_fx(datadir_fx, datetime.date(2021, 2, 6))
+    (datadir_fx / "2021-02-03.txt").unlink()
+    assert store.update() == [datetime.date(2021, 2, day)
+                              for day in (3, 4, 6)]
+
+    counts = RollupStore(reader, path).query(datetime.date(2021, 2, 1),
+                                             datetime.date(2021, 2, 28),
+                                             "day", "count")
+    assert counts.values.tolist() == [60, 24 * 60, 24 * 60]
@@ -0,0 +1,116 @@
+"""
+Tests for the HTTP server.
+"""
+
+import asyncio
+import csv
+import datetime
+import io
+import json
+
+import pytest
+
+from energy_plotter.server import PlotServer
+
+
+@pytest.fixture
+def server_fx(datadir_fx):
+    """
+    Return a running server for the test data and a function for making GET
+    requests to it, returning the status code, headers and body.
+    """
+    loop = asyncio.new_event_loop()
+    server = PlotServer(str(datadir_fx), workers=1)
+    host, port = loop.run_until_complete(server.start(port=0))
+
+    async def request(path):
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write("GET {} HTTP/1.1\r\nHost: localhost\r\n\r\n".format(
+            path).encode())
+        response = await reader.read()
+        writer.close()
+        head, _, body = response.partition(b"\r\n\r\n")
+        lines = head.decode().split("\r\n")
+        headers = dict(line.split(": ", 1) for line in lines[1:])
+        return int(lines[0].split()[1]), headers, body
+
+    async def request_all(paths):
+        return await asyncio.gather(*(request(path) for path in paths))
+
+    def get(*paths):
+        responses = loop.run_until_complete(request_all(paths))
+        return responses if len(paths) > 1 else responses[0]
+
+    yield server, get
+    loop.run_until_complete(server.close())
+    loop.close()
+
+
+# pylint: disable=redefined-outer-name
+
+def test_day_plot(server_fx):
+    """
+    Test serving a day plot and its caching.
+    """
+    server, get = server_fx
+    responses = get("/day/2021-02-04.png", "/range/2021-02-03/2021-02-05.png")
+    for status, headers, body in responses:
+        assert status == 200
+        assert headers["Content-Type"] == "image/png"
+        assert body.startswith(b"\x89PNG")
+    assert len(server.images) == 2
+
+    status, _, body = get("/day/2021-02-04.png")
+    assert status == 200
+    assert body == responses[0][2]
+    assert server.images.hits == 1
+
+
+def test_changed_file_is_rendered_again(server_fx, datadir_fx,
+                                        write_day_fx):
+    """
+    Test that a changed data file invalidates the cached image.
+    """
+    server, get = server_fx
+    get("/day/2021-02-04.png")
+    write_day_fx(datadir_fx, datetime.date(2021, 2, 4), minutes=range(60))
+    status, _, _ = get("/day/2021-02-04.png")
+    assert status == 200
+    assert server.images.hits == 0
+    assert len(server.images) == 2
+
+
+def test_aggregates(server_fx):
+    """
+    Test serving aggregates as JSON and CSV.
+    """
+    _, get = server_fx
+    status, headers, body = get(
+        "/aggregate.json?start=2021-02-03&end=2021-02-04&bucket=day"
+        "&values=pulses")
+    assert status == 200
+    assert headers["Content-Type"] == "application/json"
+    result = json.loads(body.decode())
+    assert result["starts"] == ["2021-02-03T00:00", "2021-02-04T00:00"]
+    assert result["values"][1] - result["values"][0] == 1440
+
+    status, headers, body = get(
+        "/aggregate.csv?start=2021-02-03&end=2021-02-03&bucket=60&how=count")
+    assert status == 200
+    rows = list(csv.reader(io.StringIO(body.decode())))
+    assert rows[0] == ["start", "kwhs"]
+    assert rows[1] == ["2021-02-03T00:00", "60"]
+    assert len(rows) == 25
+
+
+def test_errors(server_fx):
+    """
+    Test the responses to invalid requests.
+    """
+    _, get = server_fx
+    assert get("/day/2021-03-01.png")[0] == 404
+    assert get("/day/yesterday.png")[0] == 400
+    assert get("/unknown")[0] == 404
+    assert get("/aggregate.json?start=2021-02-03")[0] == 400
+    assert get("/aggregate.json?start=2021-02-03&end=2021-02-03"
+               "&bucket=7")[0] == 400
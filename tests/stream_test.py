@@ -0,0 +1,100 @@
+"""
+Tests for streaming processing of pulse count data.
+"""
+
+import datetime
+import functools
+import io
+
+import numpy as np
+
+from energy_plotter.data_reader import PulseReader
+from energy_plotter.stream import (aggregate_stream, filter_range, pipeline,
+                                   read_chunks, rechunk, Series, to_series,
+                                   write_csv)
+
+
+def test_read_chunks(datadir_fx):
+    """
+    Test that the stream yields one dataset per day in timestamp order.
+    """
+    reader = PulseReader(datadir_fx)
+    chunks = list(read_chunks(reader, datetime.date(2021, 2, 4)))
+    assert [len(chunk) for chunk in chunks] == [1440, 1440]
+    assert chunks[0].timestamps[0] == np.datetime64("2021-02-04T00:00")
+    assert chunks[1].timestamps[-1] == np.datetime64("2021-02-05T23:59")
+
+
+def test_rechunk(datadir_fx):
+    """
+    Test that rechunking yields fixed size chunks of all the data.
+    """
+    reader = PulseReader(datadir_fx)
+    chunks = list(rechunk(read_chunks(reader), 1000))
+    assert [len(chunk) for chunk in chunks] == [1000] * 4 + [320]
+    combined = np.concatenate([chunk.minutes for chunk in chunks])
+    assert np.array_equal(combined, reader.read_range(
+        datetime.date(2021, 2, 3), datetime.date(2021, 2, 5)).minutes)
+
+
+def test_filter_range_stops_reading(datadir_fx):
+    """
+    Test that filtering cuts the chunks and stops at the end of the range.
+    """
+    reader = PulseReader(datadir_fx)
+    read_days = []
+
+    def source():
+        for chunk in read_chunks(reader):
+            read_days.append(chunk.timestamps[0])
+            yield chunk
+
+    chunks = list(filter_range(source(), datetime.datetime(2021, 2, 3, 23),
+                               datetime.datetime(2021, 2, 4, 1)))
+    assert sum(len(chunk) for chunk in chunks) == 120
+    assert len(read_days) == 3
+
+    series = list(filter_range(
+        to_series(read_chunks(reader)), end=datetime.datetime(2021, 2, 3, 0,
+                                                              10)))
+    assert isinstance(series[0], Series)
+    assert len(series[0].values) == 10
+
+
+def test_aggregate_across_chunks(datadir_fx):
+    """
+    Test that buckets spanning several chunks match in-memory aggregation.
+    """
+    reader = PulseReader(datadir_fx)
+    expected = reader.read_range(datetime.date(2021, 2, 3),
+                                 datetime.date(2021, 2, 5))
+    for bucket in ("hour", "day", "week"):
+        for how in ("sum", "mean", "max", "min", "count"):
+            results = list(aggregate_stream(
+                to_series(rechunk(read_chunks(reader), 333), "pulses"),
+                bucket, how))
+            starts = np.concatenate([result.starts for result in results])
+            values = np.concatenate([result.values for result in results])
+            wanted = expected.resample(bucket, how, "pulses")
+            assert np.array_equal(starts, wanted.starts)
+            assert np.allclose(values, wanted.values)
+
+
+def test_write_csv_pipeline(datadir_fx):
+    """
+    Test writing daily totals into a CSV file with a pipeline.
+    """
+    reader = PulseReader(datadir_fx)
+    out = io.StringIO()
+    rows = pipeline(read_chunks(reader),
+                    functools.partial(to_series, values="pulses"),
+                    functools.partial(aggregate_stream, bucket="day"),
+                    functools.partial(write_csv, out=out,
+                                      header=("day", "pulses")))
+    assert rows == 3
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "day,pulses"
+    # Minutes of day modulo 100 over 1440 minutes, plus the day of month
+    daily = 14 * 4950 + sum(range(40)) + 1440 * 3
+    assert lines[1] == "2021-02-03T00:00,{}".format(daily)
+    assert len(lines) == 4